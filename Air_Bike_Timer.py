@@ -9,6 +9,12 @@ from kivy.graphics import Color, Rectangle
 from kivy.utils import get_color_from_hex
 import os
 
+from deadline_timer import DeadlineTimer, TICK_INTERVAL, format_mmss
+from routine_timeline import RoutineTimeline
+import routines
+from tone_bank import ToneBank
+import eco_mode
+
 # Configuration for colors
 COLOR_BG_READY = get_color_from_hex('#2C3E50')  # Dark Blue
 COLOR_BG_SPRINT = get_color_from_hex('#27AE60') # Green
@@ -18,51 +24,20 @@ COLOR_BG_DONE = get_color_from_hex('#F39C12')   # Orange
 class WorkoutTimerApp(App):
     def build(self):
         # 1. Build Routine with "Set/Rep" Labels
-        # Format: (Type, Duration, Label_Text)
-        self.routine = []
-        
-        # --- 5-Second Warning Phase ---
-        self.routine.append(("READY", 5, "GET READY"))
-        
-        # Set 1: 7 Reps (10s sprint, 30s rest)
-        for i in range(1, 8):
-            lbl = f"SET 1: REP {i} / 7"
-            self.routine.append(("SPRINT", 10, lbl))
-            self.routine.append(("REST", 30, lbl))
-            
-        # Set 2: 4 Reps (20s sprint, 1:00 rest)
-        for i in range(1, 5):
-            lbl = f"SET 2: REP {i} / 4"
-            self.routine.append(("SPRINT", 20, lbl))
-            self.routine.append(("REST", 60, lbl))
-            
-        # Set 3: 2 Reps (30s sprint, 1:30 rest)
-        for i in range(1, 3):
-            lbl = f"SET 3: REP {i} / 2"
-            self.routine.append(("SPRINT", 30, lbl))
-            self.routine.append(("REST", 90, lbl))
-            
-        # Set 4: 1 Rep (60s sprint, 3:00 rest)
-        lbl = "SET 4: REP 1 / 1"
-        self.routine.append(("SPRINT", 60, lbl))
-        self.routine.append(("REST", 180, lbl))
-        
-        # Set 5: 1 Rep (20s sprint, DONE)
-        lbl = "SET 5: FINAL SPRINT"
-        self.routine.append(("SPRINT", 20, lbl))
-        self.routine.append(("DONE", 0, "COMPLETE"))
+        self.routine = RoutineTimeline(routines.load_routine("air_bike_timer"))
 
         # App State
         self.current_step_index = 0
-        self.time_remaining = 0
+        self.timer = DeadlineTimer()
         self.timer_event = None
         
         # --- AUDIO SETUP ---
-        sound_path = '/storage/emulated/0/Download/'
+        # Tones are synthesised once and cached in the app's private dir
         self.sounds = {}
         try:
-            self.sounds['beep'] = SoundLoader.load(os.path.join(sound_path, 'beep.wav'))
-            self.sounds['buzzer'] = SoundLoader.load(os.path.join(sound_path, 'buzzer.wav'))
+            bank = ToneBank(os.path.join(self.user_data_dir, 'tones'))
+            self.sounds['beep'] = SoundLoader.load(bank.path('beep'))
+            self.sounds['buzzer'] = SoundLoader.load(bank.path('buzzer'))
         except Exception as e:
             print(f"Error loading sounds: {e}")
 
@@ -149,6 +124,7 @@ class WorkoutTimerApp(App):
             # STOP ACTION
             self.timer_event.cancel()
             self.timer_event = None
+            self.timer.pause()
             self.btn_main.text = "RESUME"
             self.btn_main.background_color = (0, 0.8, 0, 1) # Green
             
@@ -165,16 +141,21 @@ class WorkoutTimerApp(App):
             self.btn_main.background_color = (0.9, 0, 0, 1) # Red
             
             # If starting fresh
-            if self.current_step_index == 0 and self.time_remaining == 0:
+            if self.current_step_index == 0 and self.timer.remaining == 0:
                 self.load_step()
                 
-            self.timer_event = Clock.schedule_interval(self.update_timer, 1)
+            self.timer.start()
+            self.timer_event = Clock.schedule_interval(self.update_timer, TICK_INTERVAL)
 
-    def load_step(self):
+    def load_step(self, chained=False):
         step_type, duration, info_text = self.routine[self.current_step_index]
         
-        # Only reset time if we aren't resuming (checked via logic elsewhere, but here we usually load full duration on step change)
-        self.time_remaining = duration
+        # Auto-advance chains onto the previous deadline so late ticks never add up;
+        # manual skips restart the countdown from now
+        if chained:
+            self.timer.advance(duration)
+        else:
+            self.timer.set(duration)
         self.lbl_info.text = info_text
         
         if step_type == "READY":
@@ -196,17 +177,16 @@ class WorkoutTimerApp(App):
         self.update_timer_label()
 
     def update_timer(self, dt):
-        self.time_remaining -= 1
-        if self.time_remaining < 0:
-            self.go_next(None) # Auto advance
-        else:
+        # Catch up on every step whose deadline passed, however late this tick fired
+        while self.timer_event and self.timer.expired and self.current_step_index < len(self.routine) - 1:
+            self.go_next(None, chained=True) # Auto advance
+        if self.timer_event:
             self.update_timer_label()
 
     def update_timer_label(self):
-        mins, secs = divmod(self.time_remaining, 60)
-        self.lbl_timer.text = f"{mins:02d}:{secs:02d}"
+        self.lbl_timer.text = format_mmss(self.timer.seconds_left())
 
-    def go_next(self, instance):
+    def go_next(self, instance, chained=False):
         if self.current_step_index < len(self.routine) - 1:
             self.current_step_index += 1
             
@@ -218,7 +198,7 @@ class WorkoutTimerApp(App):
             else:
                 self.play_sound('beep')
                 
-            self.load_step()
+            self.load_step(chained)
         else:
             # Already at end
             pass
@@ -233,10 +213,19 @@ class WorkoutTimerApp(App):
         if self.timer_event:
             self.timer_event.cancel()
             self.timer_event = None
+        self.timer.stop()
         self.btn_main.text = "RESET"
         self.btn_main.background_color = (0, 0.8, 0, 1)
         self.current_step_index = 0
 
+    def on_start(self):
+        # Slows the loop whenever the timer isn't running
+        self.eco = eco_mode.install()
+
+    def on_stop(self):
+        if self.eco:
+            self.eco.report()
+
     def play_sound(self, name):
         sound = self.sounds.get(name)
         if sound:
@@ -1,3 +1,4 @@
+import startup_profile  # first, so the Kivy imports below can be timed
 import kivy
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
@@ -13,6 +14,18 @@ from kivy.utils import platform
 from kivy.uix.screenmanager import ScreenManager, Screen
 import os
 
+from deadline_timer import DeadlineTimer, TICK_INTERVAL, format_mmss
+from routine_timeline import RoutineTimeline
+import routines
+from cue_player import CuePlayer
+from tone_bank import ToneBank
+from session_checkpoint import SessionCheckpoint, routine_id, resume_point
+from startup_profile import stage
+import session_log as events
+import timing_hud
+import eco_mode
+from session_log import SessionLog
+
 # --- COLORS ---
 COLOR_MENU = get_color_from_hex('#2C3E50')    # Dark Blue
 COLOR_SPRINT = get_color_from_hex('#27AE60')  # Green
@@ -22,28 +35,26 @@ COLOR_BTN_GRAY = get_color_from_hex('#7F8C8D')
 COLOR_BTN_BLUE = get_color_from_hex('#2980B9') 
 COLOR_CTRL_BG = (0, 0, 0, 0.6) # Semi-transparent black for control bar
 
+CHECKPOINT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "airbike_session.ckpt")
+SESSION_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_log")
+
 # --- AUDIO MANAGER ---
-class SoundManager:
+class SoundManager(CuePlayer):
     def __init__(self):
-        self.sound_path = '/storage/emulated/0/Download/'
-        self.sounds = {}
+        super(SoundManager, self).__init__()
+        # Cue tones are synthesised once and cached in the app's private dir
         try:
-            self.sounds['beep'] = SoundLoader.load(os.path.join(self.sound_path, 'beep.wav'))
-            self.sounds['buzzer'] = SoundLoader.load(os.path.join(self.sound_path, 'buzzer.wav'))
+            bank = ToneBank(os.path.join(App.get_running_app().user_data_dir, 'tones'))
+            for name in bank.tones:
+                self.load(name, bank.path(name))
         except Exception as e:
             print(f"Error loading sounds: {e}")
 
-    def play(self, name):
-        sound = self.sounds.get(name)
-        if sound:
-            try:
-                if sound.state == 'play':
-                    sound.stop()
-                sound.play()
-            except:
-                pass
-
 audio_manager = None
+session_checkpoint = None
+event_log = None
+timing = None  # TimingProbe when TIMING_HUD is set
+eco = None  # EcoMode unless ECO_MODE=0
 
 # ==========================================
 # SCREEN 1: MAIN MENU
@@ -104,9 +115,10 @@ class MenuScreen(Screen):
 class AirBikeScreen(Screen):
     def __init__(self, **kwargs):
         super(AirBikeScreen, self).__init__(**kwargs)
-        self.routine = self._build_routine()
+        self.routine = RoutineTimeline(self._build_routine())
+        self.routine_id = routine_id(self.routine)
         self.current_step_index = 0
-        self.time_remaining = 0
+        self.timer = DeadlineTimer()
         self.timer_event = None
 
         self.layout = BoxLayout(orientation='vertical', padding=0, spacing=0)
@@ -176,50 +188,43 @@ class AirBikeScreen(Screen):
         self.add_widget(self.layout)
 
     def _build_routine(self):
-        r = []
-        r.append(("READY", 5, "GET READY"))
-        
-        # --- 1. WARM UP (0:00 - 4:00) ---
-        r.append(("WARMUP", 150, "WARM UP: BUILD (50-60%)"))
-        r.append(("SPRINT", 5, "SPRINT: 80-90% EFFORT"))
-        r.append(("WARMUP", 25, "WARM UP: 60% EFFORT"))
-        r.append(("SPRINT", 5, "SPRINT: 80-90% EFFORT"))
-        r.append(("WARMUP", 25, "WARM UP: 60% EFFORT"))
-        r.append(("SPRINT", 5, "SPRINT: 80-90% EFFORT"))
-        r.append(("WARMUP", 25, "WARM UP: 60% EFFORT"))
-
-        # --- 2. PHASE 1 ---
-        r.append(("WORK", 90, "PHASE 1: 70% THRESHOLD")) 
-        r.append(("SPRINT", 15, "PHASE 1: 90% SPRINT")) 
-        r.append(("WORK", 75, "PHASE 1: 70% THRESHOLD")) 
-
-        # --- 3. PHASE 2 ---
-        r.append(("SPRINT", 15, "ARMS ONLY: MAX EFFORT")) 
-        r.append(("WORK", 45, "HEAVY RESISTANCE GRIND"))
-        r.append(("SPRINT", 15, "ARMS ONLY: MAX EFFORT")) 
-        r.append(("WORK", 45, "HEAVY RESISTANCE GRIND"))
-
-        # --- 4. PHASE 3 ---
-        for i in range(1, 5):
-            lbl_s = f"PHASE 3: SPRINT {i}/4 (90%)"
-            lbl_c = f"PHASE 3: CRUISE {i}/4 (50%)"
-            r.append(("SPRINT", 20, lbl_s))
-            r.append(("WARMUP", 10, lbl_c))
-
-        # --- 5. RECOVERY ---
-        r.append(("REST", 120, "RECOVERY: 40% (DON'T STOP)"))
-
-        # --- 6. INTERVALS ---
-        for i in range(1, 5):
-            lbl = f"INTERVAL {i}/4"
-            r.append(("SPRINT", 20, f"{lbl}: 100% MAX EFFORT"))
-            r.append(("REST", 40, f"{lbl}: REST (0%)"))
-
-        # --- 7. COOLDOWN ---
-        r.append(("WARMUP", 180, "COOLDOWN: LIGHT FLUSH"))
-        
-        r.append(("DONE", 0, "WORKOUT COMPLETE"))
-        return r
+        return routines.load_routine("air_bike_and_loop")
+
+    def save_checkpoint(self):
+        if not session_checkpoint:
+            return
+        try:
+            session_checkpoint.save(self.routine_id, self.current_step_index, self.timer.remaining, self.timer.running)
+        except Exception as e:
+            print(f"Checkpoint failed: {e}")
+
+    def log_event(self, kind, t=None):
+        if not event_log:
+            return
+        try:
+            event_log.append(kind, self.routine_id, self.current_step_index, self.routine[self.current_step_index][2], t)
+        except Exception as e:
+            print(f"Session log failed: {e}")
+
+    def restore_checkpoint(self):
+        # Pick up a session the OS killed, at the second it would be at now
+        cp = session_checkpoint.load() if session_checkpoint else None
+        if not cp or cp.routine_id != self.routine_id or cp.step_index >= len(self.routine):
+            return False
+        idx, left = resume_point(cp, self.routine)
+        if self.routine[idx][0] == "DONE":
+            session_checkpoint.clear()
+            return False
+        self.current_step_index = idx
+        self.load_step()
+        self.timer.set(left)
+        self.btn_main.text = "RESUME"
+        if cp.running:
+            self.toggle_timer(None)
+        else:
+            self.update_timer_label()
+            self.save_checkpoint()
+        return True
 
     def _update_rect(self, instance, value):
         self.rect.pos = instance.pos
@@ -230,6 +235,8 @@ class AirBikeScreen(Screen):
         self.controls_rect.size = instance.size
 
     def go_back(self, instance):
+        if self.timer_event:
+            self.log_event(events.EXIT)
         self.finish_workout()
         self.manager.current = 'menu'
 
@@ -237,20 +244,33 @@ class AirBikeScreen(Screen):
         if self.timer_event:
             self.timer_event.cancel()
             self.timer_event = None
+            self.timer.pause()
+            audio_manager.cancel(self)
             self.btn_main.text = "RESUME"
             self.btn_main.background_color = COLOR_SPRINT
+            self.log_event(events.PAUSE)
         else:
             if self.btn_main.text == "START":
                 audio_manager.play('beep')
             self.btn_main.text = "STOP"
             self.btn_main.background_color = COLOR_REST
-            if self.current_step_index == 0 and self.time_remaining == 0:
+            fresh = self.current_step_index == 0 and self.timer.remaining == 0
+            if fresh:
                 self.load_step()
-            self.timer_event = Clock.schedule_interval(self.update_timer, 1)
+            self.timer.start()
+            self.log_event(events.START if fresh else events.RESUME)
+            self.arm_cue()
+            self.timer_event = Clock.schedule_interval(self.update_timer, TICK_INTERVAL)
+        self.save_checkpoint()
 
-    def load_step(self):
+    def load_step(self, chained=False):
         step_type, duration, info_text = self.routine[self.current_step_index]
-        self.time_remaining = duration
+        # Auto-advance chains onto the previous deadline; manual skips restart from now
+        if chained:
+            self.timer.advance(duration)
+        else:
+            self.timer.set(duration)
+            audio_manager.cancel(self)
         self.lbl_info.text = info_text
         
         if step_type == "READY":
@@ -272,41 +292,63 @@ class AirBikeScreen(Screen):
             self.bg_color.rgba = COLOR_DONE
             self.lbl_status.text = "COMPLETE"
             self.lbl_timer.text = "00:00"
+            self.log_event(events.FINISH)
             self.finish_workout()
             return
             
         self.update_timer_label()
+        self.arm_cue()
+        self.save_checkpoint()
+
+    def arm_cue(self):
+        # The next step's beep fires on this step's deadline, not on the tick that notices it;
+        # steps already over (caught up after a stall) arm nothing
+        if self.timer.running and not self.timer.expired and self.current_step_index < len(self.routine) - 1:
+            audio_manager.countdown('countdown', self.timer.deadline, key=self)  # 3-2-1 into the next step
+            audio_manager.schedule('beep', self.timer.deadline, key=self)
 
     def update_timer(self, dt):
-        self.time_remaining -= 1
-        if self.time_remaining < 0:
-            self.go_next(None)
-        else:
+        if timing:
+            timing.tick('airbike', self.timer)
+        # Catch up on every step whose deadline passed, however late this tick fired
+        while self.timer_event and self.timer.expired and self.current_step_index < len(self.routine) - 1:
+            self.go_next(None, chained=True)
+        if self.timer_event:
             self.update_timer_label()
 
     def update_timer_label(self):
-        mins, secs = divmod(self.time_remaining, 60)
-        self.lbl_timer.text = f"{mins:02d}:{secs:02d}"
+        self.lbl_timer.text = format_mmss(self.timer.seconds_left())
 
-    def go_next(self, instance):
+    def go_next(self, instance, chained=False):
         if self.current_step_index < len(self.routine) - 1:
+            # A chained step ended on its deadline; anything else is a skip
+            if chained:
+                self.log_event(events.STEP_DONE, events.wall_time(self.timer.deadline))
+            else:
+                self.log_event(events.SKIP)
             self.current_step_index += 1
-            audio_manager.play('beep')
-            self.load_step()
+            if not chained:
+                audio_manager.play('beep')
+            self.load_step(chained)
 
     def go_prev(self, instance):
         if self.current_step_index > 0:
             self.current_step_index -= 1
             audio_manager.play('beep')
             self.load_step()
+            self.log_event(events.BACK)
 
     def finish_workout(self):
         if self.timer_event:
             self.timer_event.cancel()
             self.timer_event = None
+        self.timer.stop()
+        audio_manager.cancel(self)
         self.btn_main.text = "RESET"
         self.btn_main.background_color = COLOR_SPRINT
         self.current_step_index = 0
+        if session_checkpoint:
+            session_checkpoint.clear()
 
 # ==========================================
 # SCREEN 3: CUSTOM LOOP TIMER
@@ -316,8 +358,8 @@ class Loop30Screen(Screen):
         super(Loop30Screen, self).__init__(**kwargs)
         self.running = False
         self.timer_event = None
-        self.phase = "WORK" 
-        self.time_remaining = 30
+        self.phase = "WORK" # WORK or BREAK
+        self.timer = DeadlineTimer()
         self.default_work = 30
         self.default_rest = 2
         
@@ -434,17 +476,19 @@ class Loop30Screen(Screen):
         w, r = self.get_user_settings()
         
         self.phase = "WORK"
-        self.time_remaining = w
+        self.timer.set(w)
+        self.timer.start()
         self.update_visuals()
         
         audio_manager.play('beep')
-        self.timer_event = Clock.schedule_interval(self.update_loop, 1)
+        self.timer_event = Clock.schedule_interval(self.update_loop, TICK_INTERVAL)
 
     def stop_timer(self):
         self.running = False
         if self.timer_event:
             self.timer_event.cancel()
         self.timer_event = None
+        self.timer.stop()
         
         w, r = self.get_user_settings()
         
@@ -460,19 +504,24 @@ class Loop30Screen(Screen):
         self.update_loop(0, force_switch=True)
 
     def update_loop(self, dt, force_switch=False):
-        if not force_switch:
-            self.time_remaining -= 1
+        if force_switch:
+            # Skipping ends the current phase now; the next one counts from here
+            self.timer.set(0)
         
-        if self.time_remaining < 0 or force_switch:
+        if timing:
+            timing.tick('loop30', self.timer)
+        # Each phase starts where the previous deadline ended, so late ticks never drift
+        while self.timer.expired:
             w, r = self.get_user_settings()
+            ended = self.timer.deadline
             if self.phase == "WORK":
                 self.phase = "BREAK"
-                self.time_remaining = r
-                audio_manager.play('buzzer') 
+                self.timer.advance(max(r, 1))
+                audio_manager.play('buzzer', due=ended)
             else:
                 self.phase = "WORK"
-                self.time_remaining = w
-                audio_manager.play('beep') 
+                self.timer.advance(max(w, 1))
+                audio_manager.play('beep', due=ended)
         
         self.update_visuals()
 
@@ -484,24 +533,41 @@ class Loop30Screen(Screen):
             self.bg_color.rgba = COLOR_REST
             self.lbl_status.text = "RESET..."
 
-        mins, secs = divmod(self.time_remaining, 60)
-        self.lbl_timer.text = f"{mins:02d}:{secs:02d}"
+        self.lbl_timer.text = format_mmss(self.timer.seconds_left())
 
 # ==========================================
 # APP BUILDER
 # ==========================================
 class WorkoutApp(App):
     def build(self):
-        global audio_manager
-        audio_manager = SoundManager()
+        global audio_manager, session_checkpoint, event_log, timing
+        with stage("SoundManager()"):
+            audio_manager = SoundManager()
+        timing = timing_hud.install(self.user_data_dir)
+        if timing:
+            audio_manager.on_play = timing.cue
+        try:
+            session_checkpoint = SessionCheckpoint(CHECKPOINT_FILE)
+        except Exception as e:
+            print(f"Session checkpoint unavailable: {e}")
+        try:
+            event_log = SessionLog(SESSION_LOG_DIR)
+        except Exception as e:
+            print(f"Session log unavailable: {e}")
 
         sm = ScreenManager()
-        sm.add_widget(MenuScreen(name='menu'))
-        sm.add_widget(AirBikeScreen(name='airbike'))
-        sm.add_widget(Loop30Screen(name='loop30'))
+        with stage("screen menu"):
+            sm.add_widget(MenuScreen(name='menu'))
+        with stage("screen airbike"):
+            sm.add_widget(AirBikeScreen(name='airbike'))
+        with stage("screen loop30"):
+            sm.add_widget(Loop30Screen(name='loop30'))
         return sm
         
     def on_start(self):
+        global eco
+        # Slows the loop whenever no timer or animation is running
+        eco = eco_mode.install()
         if platform == 'android':
             try:
                 from jnius import autoclass
@@ -511,6 +577,25 @@ class WorkoutApp(App):
                 Activity.getWindow().addFlags(View.KEEP_SCREEN_ON)
             except Exception as e:
                 print(f"Failed to set Keep Screen On: {e}")
+        if self.root.get_screen('airbike').restore_checkpoint():
+            self.root.current = 'airbike'
+        startup_profile.report_after_first_frame('air_bike_and_loop')
+
+    def on_stop(self):
+        if event_log:
+            event_log.close()
+        if timing:
+            timing.export()
+        if eco:
+            eco.report()
+        if audio_manager:
+            audio_manager.report()
+
+    def on_pause(self):
+        if timing:
+            timing.export()
+        return True
 
 if __name__ == '__main__':
     WorkoutApp().run()
+    startup_profile.finish()
@@ -0,0 +1,318 @@
+"""Timing benchmarks for the hot paths, compared against a JSON baseline.
+
+The core group needs no Kivy: plan compilation, exercise matching, routine
+compilation and simulated ticks, over generated stress fixtures (a 1,000
+exercise database, a 500 step routine). The app group imports the apps with
+Kivy's mock GL backend and times get_workout/load_day for every day, building
+every Screen subclass, parse_duration over a synthetic corpus and one tick of
+each timer callback. On a CI box without a display run it under xvfb-run.
+
+    python benchmarks.py                 # run, compare with bench_baseline.json if present
+    python benchmarks.py --save          # run and make the results the new baseline
+    python benchmarks.py --filter tick   # only benchmarks whose name contains "tick"
+    python benchmarks.py --tolerance 1.5 # allowed slowdown factor (default 1.3)
+    python benchmarks.py --core-only     # skip the app group, e.g. where Kivy can't be installed
+
+Exits 1 if any benchmark is slower than its baseline by more than the
+tolerance, if there is no baseline to compare with, or if the app group could
+not run (Kivy missing, an app failing to import) without --core-only.
+
+Baselines are only comparable on the same machine, so none is committed. The
+baseline path is --baseline, else $BENCH_BASELINE, else bench_baseline.json
+next to this file. On CI, point BENCH_BASELINE at a file the runner keeps
+between jobs (its cache directory), and create it there once with --save.
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from deadline_timer import TICK_INTERVAL
+from exercise_matcher import ExerciseMatcher
+from progression import ProgressionTable, SCHEMES
+from routine_sim import simulate
+import routines
+from workout_plan import WorkoutPlan, lift
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.environ.get("BENCH_BASELINE") or os.path.join(HERE, "bench_baseline.json")
+APPS = {"rehab": "rehab", "bjj": "bjj-rehab.py", "air_bike_and_loop": "Air_Bike_and_Loop_Timer.py"}
+
+WORDS = ["Cable", "Band", "Dumbbell", "Kettlebell", "Single Leg", "Banded", "Tempo", "Paused", "Deficit",
+         "Row", "Press", "Curl", "Squat", "Lunge", "Bridge", "Carry", "Rotation", "Hold", "Raise", "Pull"]
+
+
+# ---------------------------------------------------------------- fixtures
+
+def stress_db(n=1000, seed=1):
+    """n distinct exercise names in the exercise_db shape."""
+    rng = random.Random(seed)
+    db = {}
+    while len(db) < n:
+        name = " ".join(rng.sample(WORDS, rng.randint(2, 4)))
+        db[name] = {"desc": f"{name} description.", "cue": f"{name} cue."}
+    return db
+
+
+def stress_lines(db, n=5000, seed=2):
+    """Day-list style lines: some name an exercise, some a duration, some neither."""
+    rng = random.Random(seed)
+    names = list(db)
+    out = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            out.append(f"{rng.choice(names)}: {rng.randint(2, 5)}x{rng.randint(5, 15)}")
+        elif kind == 1:
+            out.append(f"{rng.choice(names)} ({rng.randint(1, 90)} {rng.choice(['s', 'sec', 'min', 'mins'])})")
+        elif kind == 2:
+            out.append(f"Assault Bike Intervals ({rng.randint(5, 20)} mins)")
+        else:
+            out.append(f"Walk {rng.randint(10, 60)} Mins")
+    return out
+
+
+def stress_plan(db, days=7, lines_per_day=60, seed=3):
+    rng = random.Random(seed)
+    names = list(db)
+    lifts = names[:10]
+    maxes = {name: rng.randint(20, 300) for name in lifts}
+    template = {}
+    for d in range(days):
+        lines = []
+        for i in range(lines_per_day):
+            if i % 15 == 0:
+                lines.append(f"BLOCK {i // 15 + 1}")
+            elif i % 5 == 0:
+                name = rng.choice(lifts)
+                lines.append(lift(f"{name}: 3x8", name))
+            else:
+                lines.append(f"{rng.choice(names)}: {rng.randint(2, 4)}x{rng.randint(6, 12)}")
+        template[f"Day {d + 1}"] = lines
+    return template, maxes
+
+
+def stress_routine(steps=500):
+    """A routine file with 500 leaf steps, nested the way routine_defs are."""
+    per_round = [{"type": "SPRINT", "seconds": 20, "label": "Sprint {i}/{n}"},
+                 {"type": "REST", "seconds": 40, "label": "Recover {i}/{n}"}]
+    return {"steps": [{"type": "READY", "seconds": 10, "label": "Get ready"},
+                      {"phase": "main", "repeat": (steps - 2) // 2, "steps": per_round},
+                      {"type": "DONE", "seconds": 0, "label": "Done"}]}
+
+
+# ---------------------------------------------------------------- measuring
+
+def measure(fn, repeat=5, min_time=0.05):
+    """Best per-call time in seconds, over repeat runs of at least min_time each."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        took = time.perf_counter() - t0
+        if took >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(took, 1e-9)))
+    best = took / number
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best
+
+
+# ---------------------------------------------------------------- benchmarks
+
+def core_benchmarks():
+    db = stress_db()
+    lines = stress_lines(db)
+    matcher = ExerciseMatcher(db)
+    template, maxes = stress_plan(db)
+    profile = {"current_week": 3, "maxes": maxes}
+    plan = WorkoutPlan(template, [], lambda line: line.isupper(), lambda line: (matcher.match(line), None))
+    doc = stress_routine()
+    steps = routines.compile_routine(doc, "stress")
+
+    def compile_plan():
+        plan.invalidate()
+        for day in template:
+            plan.compile(day, profile)
+
+    yield "core.matcher_build[1000 exercises]", lambda: ExerciseMatcher(db)
+    yield "core.matcher_match[5000 lines]", lambda: [matcher.match(line) for line in lines]
+    yield "core.plan_compile[7 days x 60 lines]", compile_plan
+    yield "core.plan_compile_cached[7 days]", lambda: [plan.compile(day, profile) for day in template]
+    yield "core.progression_table[10 lifts]", lambda: ProgressionTable(maxes, SCHEMES["wave_deload"])
+    yield "core.routine_compile[500 steps]", lambda: routines.compile_routine(doc, "stress")
+    for name in routines.available():
+        yield f"core.routine_load[{name}]", lambda name=name: routines.load_routine(name)
+    yield "core.routine_sim_jump[500 steps]", lambda: simulate(steps, labels=True)
+    yield "core.routine_sim_tick[500 steps]", lambda: simulate(steps, labels=True, tick=TICK_INTERVAL)
+
+
+def load_app(key):
+    path = os.path.join(HERE, APPS[key])
+    loader = importlib.machinery.SourceFileLoader(f"bench_{key}", path)
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+def headless_env():
+    """Kivy settings for running the apps without a real GL context."""
+    os.environ.setdefault("KIVY_GL_BACKEND", "mock")
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+
+def app_benchmarks(skipped):
+    """The app group; whatever can't run is added to skipped."""
+    headless_env()
+    try:
+        from kivy.uix.screenmanager import Screen
+    except ImportError as e:
+        print(f"[bench] app benchmarks skipped, Kivy unavailable ({e})")
+        skipped.append("kivy")
+        return
+    for key in APPS:
+        try:
+            app = load_app(key)
+        except Exception as e:
+            print(f"[bench] {key}: import failed ({e!r}), skipped")
+            skipped.append(key)
+            continue
+        yield from _app_benchmarks(key, app, Screen)
+
+
+def _app_benchmarks(key, app, Screen):
+    screens = {name: cls for name, cls in vars(app).items()
+               if inspect.isclass(cls) and issubclass(cls, Screen) and cls.__module__ == app.__name__}
+    for name, cls in screens.items():
+        yield f"{key}.screen[{name}]", lambda cls=cls: cls(name="bench")
+
+    plan = getattr(app, "plan", None)
+    if plan is not None:
+        days = list(plan.days) + ["Rest"]
+        rows = getattr(app, "day_rows_cache", {})
+
+        def workouts():
+            plan.invalidate()
+            for day in days:
+                app.get_workout(day)
+        yield f"{key}.get_workout[all days]", workouts
+
+        day_screen = screens["DayScreen"](name="day")
+
+        def load_days():
+            plan.invalidate()
+            rows.clear()
+            for day in days:
+                day_screen.load_day(day)
+        yield f"{key}.load_day[all days]", load_days
+
+    if hasattr(app, "parse_duration"):
+        corpus = stress_lines(stress_db(), n=10000)
+        yield f"{key}.parse_duration[10000 lines]", lambda: [app.parse_duration(line) for line in corpus]
+
+    for name, cls in screens.items():
+        for callback in ("update_timer", "update_loop", "update"):
+            if callable(getattr(cls, callback, None)):
+                try:
+                    yield f"{key}.tick[{name}.{callback}]", _ticker(cls, callback)
+                except Exception as e:
+                    print(f"[bench] {key}.tick[{name}.{callback}]: setup failed ({e!r})")
+                break
+
+
+def _ticker(cls, callback):
+    """One steady-state call of a timer callback: running, far from any deadline."""
+    screen = cls(name="bench")
+    if hasattr(screen, "running"):
+        screen.running = True
+    screen.timer.set(3600)
+    screen.timer.start()
+    fn = getattr(screen, callback)
+    return lambda: fn(TICK_INTERVAL)
+
+
+# ---------------------------------------------------------------- reporting
+
+def run(name_filter=None, core_only=False):
+    """(results in microseconds, names of app groups that couldn't run)."""
+    results = {}
+    skipped = []
+    groups = [core_benchmarks()] if core_only else [core_benchmarks(), app_benchmarks(skipped)]
+    for group in groups:
+        for name, fn in group:
+            if name_filter and name_filter not in name:
+                continue
+            try:
+                results[name] = measure(fn) * 1e6
+            except Exception as e:
+                print(f"[bench] {name}: failed ({e!r})")
+                continue
+            print(f"{name:<55} {results[name]:>12.1f} us")
+    return results, skipped
+
+
+def compare(results, baseline, tolerance):
+    slower = []
+    for name, us in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = us / base if base else 1.0
+        if ratio > tolerance:
+            slower.append(name)
+            print(f"SLOWER {name}: {base:.1f} -> {us:.1f} us ({ratio:.2f}x)")
+        elif ratio < 1 / tolerance:
+            print(f"faster {name}: {base:.1f} -> {us:.1f} us ({ratio:.2f}x)")
+    return slower
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Time the hot paths and compare with a baseline.")
+    parser.add_argument("--save", action="store_true", help="make these results the baseline")
+    parser.add_argument("--filter", dest="name_filter", help="only benchmarks whose name contains this")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="allowed slowdown factor")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file (default $BENCH_BASELINE)")
+    parser.add_argument("--core-only", action="store_true", help="only the Kivy-free core group")
+    args = parser.parse_args(argv)
+    save, tolerance, name_filter, path = args.save, args.tolerance, args.name_filter, args.baseline
+
+    results, skipped = run(name_filter, args.core_only)
+    if skipped:
+        print(f"[bench] app group incomplete ({', '.join(skipped)}); pass --core-only to accept that")
+        return 1
+    if save:
+        baseline = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        meta = {"python": platform.python_version(), "machine": platform.machine(), "platform": platform.platform()}
+        with open(path, "w") as f:
+            json.dump({"meta": meta, "results": baseline}, f, indent=1, sort_keys=True)
+        print(f"[bench] baseline saved to {path}")
+        return 0
+    if not os.path.exists(path):
+        print(f"[bench] no baseline at {path}; run with --save to create one")
+        return 1
+    with open(path) as f:
+        baseline = json.load(f).get("results", {})
+    slower = compare(results, baseline, tolerance)
+    print(f"[bench] {len(slower)} of {len(results)} slower than baseline x{tolerance}")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
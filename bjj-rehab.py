@@ -1,3 +1,4 @@
+import startup_profile  # first, so the Kivy imports below can be timed
 import json
 import os
 import time
@@ -14,14 +15,39 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.gridlayout import GridLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.core.window import Window
 from kivy.metrics import dp
 from kivy.utils import get_color_from_hex, platform
 from kivy.clock import Clock
-from kivy.graphics import Color, Rectangle, Line
+from kivy.graphics import Color, Rectangle
 from kivy.core.audio import SoundLoader
 from kivy.animation import Animation
 
+from deadline_timer import DeadlineTimer, TICK_INTERVAL, format_mmss
+from routine_timeline import RoutineTimeline
+from countdown_label import CountdownLabel
+import routines
+from cue_player import CuePlayer
+from tone_bank import ToneBank
+from exercise_matcher import line_classifier
+from workout_plan import WorkoutPlan, lift, weight_text, profile_version
+from progression import CYCLE_WEEKS
+from profile_store import ProfileWriter, load_profile
+from session_checkpoint import routine_id
+import session_log as events
+import timing_hud
+import eco_mode
+import timer_service
+import timer_mirror
+from startup_profile import stage
+from lazy_screens import LazyScreenMixin
+from card_batch import BatchedShape, CardBatch, log_draw_calls
+from touch_index import TouchIndexed
+from text_layout import TextLayout
+
 # ==========================================
 # 1. THEME & COLORS (NEO-BRUTALIST NATURE)
 # ==========================================
@@ -41,31 +67,26 @@ COLOR_DONE_HEX   = '#FFD700'
 COLOR_BTN_BLUE_HEX = '#00CCFF'
 
 DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mma_profile_kivy.json")
+SESSION_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_log")
 
 # ==========================================
 # 2. AUDIO & DATA MANAGERS
 # ==========================================
-class SoundManager:
+class SoundManager(CuePlayer):
     def __init__(self):
-        self.sounds = {}
+        super().__init__()
+        # Cue tones are synthesised once and cached in the app's private dir
         try:
-            paths = ['/storage/emulated/0/Download/', './']
-            for p in paths:
-                beep = os.path.join(p, 'beep.wav')
-                buzzer = os.path.join(p, 'buzzer.wav')
-                if os.path.exists(beep): self.sounds['beep'] = SoundLoader.load(beep)
-                if os.path.exists(buzzer): self.sounds['buzzer'] = SoundLoader.load(buzzer)
-        except: pass
-
-    def play(self, name):
-        sound = self.sounds.get(name)
-        if sound:
-            try:
-                if sound.state == 'play': sound.stop()
-                sound.play()
-            except: pass
+            bank = ToneBank(os.path.join(App.get_running_app().user_data_dir, 'tones'))
+            for name in bank.tones: self.load(name, bank.path(name))
+        except Exception as e: print(f"Error loading sounds: {e}")
 
 audio_manager = None
+event_log = None
+timing = None  # TimingProbe when TIMING_HUD is set
+eco = None  # EcoMode unless ECO_MODE=0
+remote = None  # TimerClient when TIMER_SERVICE is set: the timer screens' routines run in timer_service
+mirror = None  # MirrorLeader when MIRROR=lead: AirBikeScreen publishes its state to MIRROR=follow devices
 
 default_profile = {
     "current_week": 1,
@@ -79,20 +100,23 @@ default_profile = {
 
 user_profile = default_profile.copy()
 
+profile_writer = None
+
 def load_data():
     global user_profile
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r') as f:
-                user_profile = json.load(f)
-        except: pass
+    plan.invalidate(); day_rows_cache.clear()
+    user_profile, error = load_profile(DATA_FILE, default_profile.copy())
+    if error: report_error(error)
 
 def save_data():
-    try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(user_profile, f)
-        return True
-    except: return False
+    plan.invalidate(); day_rows_cache.clear()
+    profile_writer.save(user_profile)  # coalesced, written atomically off the UI thread
+    return True
+
+def report_error(msg):
+    print(msg); app = App.get_running_app()
+    if app and app.root: app.root.show_toast(msg)
+    else: Clock.schedule_once(lambda dt: report_error(msg), 0.5)
 
 def parse_duration(text):
     if "Air Bike" in text or "Assault Bike" in text: return "AIRBIKE"
@@ -140,42 +164,42 @@ exercise_db = {
     "Clam Shells": {"desc": "Lie on side, knees bent. Lift top knee.", "cue": "Squeeze glute medius. 15 per side."}
 }
 
-def get_weight(exercise):
-    if exercise not in user_profile["maxes"]: return ""
-    try:
-        one_rm = float(user_profile["maxes"][exercise])
-        w_num = user_profile["current_week"]
-        val = int((one_rm * 0.80) + ((w_num - 1) * 2.5))
-        return f"@ {val} lbs"
-    except: return ""
-
-def get_workout(day):
-    w = get_weight
-    if day == "Monday":
-        return ["MORNING ROUTINE", "Push-Ups (30 reps)", "Side Plank (1 min)", "Static Plank (1 min)", "Swiss Ball Bridge (1 min)", "Clam Shells (2 sets x 15/side)",
-                "WARMUP", "Cat-Cow (30 reps)", "Glute Bridge (2x15)",
-                "SUPERSET A", f"Hack Squat (3x8) {w('Hack Squat')}", "Box Jumps (3x5)",
-                "SUPERSET B", f"Trap Bar Farmers Walk (3x40yds) {w('Trap Bar Farmers Walk')}", "Air Bike Protocol (See Timer)",
-                "FINISHER", f"Seated Leg Curl (3x15) {w('Seated Leg Curl')}", "COOL DOWN", "90/90 Hip Flow (2 mins)"]
-    elif day == "Wednesday":
-        return ["MORNING ROUTINE", "Push-Ups (30 reps)", "Side Plank (1 min)", "Static Plank (1 min)", "Swiss Ball Bridge (1 min)", "Clam Shells (2 sets x 15/side)",
-                "WARMUP", "Pallof Press (3x10/side)",
-                "SUPERSET A", f"Dumbbell Bench Press (3x10) {w('Dumbbell Bench Press')}", f"Cable Row (3x12) {w('Cable Row')}",
-                "SUPERSET B", f"Tricep Pushdowns (3x15) {w('Tricep Pushdowns')}", f"Cable Face Pulls (3x15) {w('Cable Face Pulls')}",
-                "CARDIO", "Air Bike Protocol (See Timer)"]
-    elif day == "Friday":
-        return ["MORNING ROUTINE", "Push-Ups (30 reps)", "Side Plank (1 min)", "Static Plank (1 min)", "Swiss Ball Bridge (1 min)", "Clam Shells (2 sets x 15/side)",
-                "WARMUP", "Bird Dog (3x10/side)", "Split Squat BW (2x5/side)",
-                "CIRCUIT", f"1. Unilateral Leg Press (10/side) {w('Unilateral Leg Press')}", f"2. Cable Woodchoppers (12/side) {w('Cable Woodchoppers')}",
-                f"3. Leg Extension (15 reps) {w('Leg Extension')}", "4. Plank (1 min)", "COOL DOWN", "Couch Stretch (3x30s/side)"]
-    elif day in ["Tuesday", "Thursday", "Saturday"]:
-        return ["PRE-COMBAT", "Lower Body Warm-Up (1 Round)", "Adductor Rock Back (1 min)", "ACTIVITY", "BJJ / Kickboxing Class", "POST-COMBAT", "Relaxation Breathing (5 mins)", "Malasana Squat (2 mins)"]
-    return ["Active Recovery", "Walk 45 Mins", "Meal Prep"]
+classify_line = line_classifier(exercise_db, parse_duration)  # longest exercise name in the line wins
+
+MORNING_ROUTINE = ["MORNING ROUTINE", "Push-Ups (30 reps)", "Side Plank (1 min)", "Static Plank (1 min)", "Swiss Ball Bridge (1 min)", "Clam Shells (2 sets x 15/side)"]
+COMBAT_DAY = ["PRE-COMBAT", "Lower Body Warm-Up (1 Round)", "Adductor Rock Back (1 min)", "ACTIVITY", "BJJ / Kickboxing Class", "POST-COMBAT", "Relaxation Breathing (5 mins)", "Malasana Squat (2 mins)"]
+REST_DAY = ["Active Recovery", "Walk 45 Mins", "Meal Prep"]
+
+WORKOUT_DAYS = {
+    "Monday": MORNING_ROUTINE + ["WARMUP", "Cat-Cow (30 reps)", "Glute Bridge (2x15)",
+        "SUPERSET A", lift("Hack Squat (3x8)", "Hack Squat"), "Box Jumps (3x5)",
+        "SUPERSET B", lift("Trap Bar Farmers Walk (3x40yds)", "Trap Bar Farmers Walk"), "Air Bike Protocol (See Timer)",
+        "FINISHER", lift("Seated Leg Curl (3x15)", "Seated Leg Curl"), "COOL DOWN", "90/90 Hip Flow (2 mins)"],
+    "Wednesday": MORNING_ROUTINE + ["WARMUP", "Pallof Press (3x10/side)",
+        "SUPERSET A", lift("Dumbbell Bench Press (3x10)", "Dumbbell Bench Press"), lift("Cable Row (3x12)", "Cable Row"),
+        "SUPERSET B", lift("Tricep Pushdowns (3x15)", "Tricep Pushdowns"), lift("Cable Face Pulls (3x15)", "Cable Face Pulls"),
+        "CARDIO", "Air Bike Protocol (See Timer)"],
+    "Friday": MORNING_ROUTINE + ["WARMUP", "Bird Dog (3x10/side)", "Split Squat BW (2x5/side)",
+        "CIRCUIT", lift("1. Unilateral Leg Press (10/side)", "Unilateral Leg Press"), lift("2. Cable Woodchoppers (12/side)", "Cable Woodchoppers"),
+        lift("3. Leg Extension (15 reps)", "Leg Extension"), "4. Plank (1 min)", "COOL DOWN", "Couch Stretch (3x30s/side)"],
+    "Tuesday": COMBAT_DAY,
+    "Thursday": COMBAT_DAY,
+    "Saturday": COMBAT_DAY,
+}
+
+SECTION_WORDS = ["WARMUP", "SUPERSET", "COOL", "COMBAT", "FINISHER", "CIRCUIT", "CARDIO", "MORNING"]
+def is_section(line): return any(x in line for x in SECTION_WORDS)
+plan = WorkoutPlan(WORKOUT_DAYS, REST_DAY, is_section, classify_line)  # compiled per (day, week, maxes)
+
+def get_weight(exercise): return weight_text(plan.load(exercise, user_profile))
+def get_workout(day): return [e.text for e in plan.compile(day, user_profile)]
 
 # ==========================================
 # 4. NEO-BRUTALIST UI COMPONENTS
 # ==========================================
 
+text_layout = TextLayout()  # wrap widths follow the window; re-laid out once per resize
+
 class SectionHeader(Label):
     def __init__(self, text, **kwargs):
         super().__init__(text=text.upper(), **kwargs)
@@ -184,7 +208,7 @@ class SectionHeader(Label):
         self.bold = True
         self.size_hint_y = None
         self.height = dp(40)
-        self.text_size = (Window.width - dp(40), None)
+        text_layout.wrap(self, dp(40))
         self.halign = 'left'
         self.valign = 'bottom'
         with self.canvas.before:
@@ -194,7 +218,10 @@ class SectionHeader(Label):
     def update_ui(self, *args):
         self.line_instr.pos = (self.x + dp(20), self.y + dp(5))
 
-class NeoCard(BoxLayout):
+PRESS_COLOR = get_color_from_hex("#252525")
+
+class NeoCard(BatchedShape, BoxLayout):
+    indexed_touch = True  # found through the list's TouchIndex, not a scan of every card
     def __init__(self, command=None, bg_color=get_color_from_hex(C_CARD), border_color=get_color_from_hex(C_BORDER), **kwargs):
         super().__init__(**kwargs)
         self.command = command
@@ -205,37 +232,33 @@ class NeoCard(BoxLayout):
         self.height = dp(90)
         self.bg_val = bg_color
         self.press_pos = None
-        with self.canvas.before:
-            Color(0, 0, 0, 1) # Shadow
-            self.shadow = Rectangle(pos=(self.x + dp(4), self.y - dp(4)), size=self.size)
-            self.rect_color = Color(*self.bg_val)
-            self.rect = Rectangle(pos=self.pos, size=self.size)
-            Color(*border_color)
-            self.border_instr = Line(rectangle=(self.x, self.y, self.width, self.height), width=1.5)
-        self.bind(pos=self.update_ui, size=self.update_ui)
-    def update_ui(self, *args):
-        self.rect.pos = self.pos; self.rect.size = self.size
-        self.shadow.pos = (self.x + dp(4), self.y - dp(4)); self.shadow.size = self.size
-        self.border_instr.rectangle = (self.x, self.y, self.width, self.height)
+        self.controls = []  # nested buttons, kept as they're added instead of walked per touch
+        self.shadow_offset = dp(4); self.border_width = 1.5
+        self.init_shape(self.bg_val, border_color)  # batched when the list has a CardBatch
     def on_touch_down(self, touch):
         if self.collide_point(*touch.pos):
             self.press_pos = touch.pos
-            self.rect_color.rgba = get_color_from_hex("#252525")
-            self.rect.pos = (self.x + dp(2), self.y - dp(2))
+            self.set_fill(PRESS_COLOR, dp(2))
             return super().on_touch_down(touch)
     def on_touch_up(self, touch):
         if self.collide_point(*touch.pos) and self.press_pos:
             if math.hypot(touch.x - self.press_pos[0], touch.y - self.press_pos[1]) < dp(20):
-                for child in self.walk():
-                    if isinstance(child, Button) and child.collide_point(*touch.pos):
+                for child in self.controls:
+                    if child.collide_point(*touch.pos):
                         self.reset_vis(); return super().on_touch_up(touch)
                 if self.command: self.command()
         self.reset_vis()
         return super().on_touch_up(touch)
     def reset_vis(self):
-        self.rect_color.rgba = self.bg_val; self.rect.pos = self.pos; self.press_pos = None
+        self.set_fill(self.bg_val, 0); self.press_pos = None
+    def add_widget(self, widget, *args, **kwargs):
+        super().add_widget(widget, *args, **kwargs)
+        self.controls.extend(w for w in widget.walk(restrict=True) if isinstance(w, Button))
+    def remove_widget(self, widget, *args, **kwargs):
+        super().remove_widget(widget, *args, **kwargs)
+        self.controls = [w for w in self.walk(restrict=True) if isinstance(w, Button)]
 
-class NeoButton(Button):
+class NeoButton(BatchedShape, Button):
     def __init__(self, **kwargs):
         bg_hex = kwargs.pop('background_color_hex', C_CARD)
         fg_hex = kwargs.pop('color_hex', C_TEXT)
@@ -244,31 +267,21 @@ class NeoButton(Button):
         self.bg_val = get_color_from_hex(bg_hex)
         self.color = get_color_from_hex(fg_hex)
         self.bold = True
-        with self.canvas.before:
-            Color(0, 0, 0, 1) # Shadow
-            self.shadow = Rectangle(pos=(self.x+dp(3), self.y-dp(3)), size=self.size)
-            self.rect_c = Color(*self.bg_val)
-            self.rect = Rectangle(pos=self.pos, size=self.size)
-            Color(*get_color_from_hex(C_BORDER))
-            self.border_instr = Line(rectangle=(self.x, self.y, self.width, self.height), width=1.2)
-        self.bind(pos=self.update_ui, size=self.update_ui, state=self.on_state)
-    def update_ui(self, *args):
-        self.rect.pos = self.pos; self.rect.size = self.size
-        self.shadow.pos = (self.x+dp(3), self.y-dp(3)); self.shadow.size = self.size
-        self.border_instr.rectangle = (self.x, self.y, self.width, self.height)
+        self.shadow_offset = dp(3); self.border_width = 1.2
+        self.init_shape(self.bg_val, get_color_from_hex(C_BORDER))
+        self.bind(state=self.on_state)
     def on_state(self, instance, value):
-        if value == 'down': self.rect.pos = (self.x+dp(2), self.y-dp(2))
-        else: self.rect.pos = self.pos
+        self.set_fill(None, dp(2) if value == 'down' else 0)
 
 # ==========================================
 # 5. SCREENS & NAVIGATION
 # ==========================================
 
-class SwipeManager(ScreenManager):
+class SwipeManager(LazyScreenMixin, ScreenManager):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.touch_start_x = 0
-        self.last_exit = 0
+        self.last_exit = 0; self.toast = None
     def on_touch_down(self, touch): self.touch_start_x = touch.x; return super().on_touch_down(touch)
     def on_touch_up(self, touch):
         dx = touch.x - self.touch_start_x
@@ -278,6 +291,14 @@ class SwipeManager(ScreenManager):
                 if time.time() - self.last_exit < 2.0: App.get_running_app().stop()
                 else: self.last_exit = time.time()
         return super().on_touch_up(touch)
+    def show_toast(self, text):
+        if self.toast: return
+        self.toast = Label(text=text, size_hint=(None, None), size=(Window.width*0.9, dp(50)), pos=(Window.width*0.05, dp(40)), color=get_color_from_hex(C_TEXT))
+        with self.toast.canvas.before: Color(0.1, 0.1, 0.1, 0.95); Rectangle(pos=self.toast.pos, size=self.toast.size)
+        Window.add_widget(self.toast); Clock.schedule_once(self.hide_toast, 3)
+    def hide_toast(self, *a): Window.remove_widget(self.toast); self.toast = None
+
+class CardList(TouchIndexed, GridLayout): pass
 
 class HomeScreen(Screen):
     def __init__(self, **kwargs):
@@ -295,8 +316,8 @@ class HomeScreen(Screen):
         btn_edit.bind(on_release=lambda x: setattr(self.manager, 'current', 'edit'))
         header.add_widget(btn_prev); header.add_widget(self.lbl_week); header.add_widget(btn_next); header.add_widget(btn_edit)
         self.layout.add_widget(header)
-        scroll = ScrollView(); list_l = GridLayout(cols=1, spacing=dp(15), size_hint_y=None, padding=dp(15))
-        list_l.bind(minimum_height=list_l.setter('height'))
+        scroll = ScrollView(); list_l = CardList(cols=1, spacing=dp(15), size_hint_y=None, padding=dp(15))
+        list_l.bind(minimum_height=list_l.setter('height')); CardBatch(list_l)  # one mesh per colour for all the cards
         for d in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
             card = NeoCard(command=lambda day=d: self.go_day(day))
             card.add_widget(Label(text=d.upper(), font_size=dp(18), bold=True, halign='left', size_hint_x=0.8))
@@ -309,10 +330,51 @@ class HomeScreen(Screen):
         btn_lp.add_widget(Label(text="LOOP TIMER", bold=True)); list_l.add_widget(btn_lp)
         scroll.add_widget(list_l); self.layout.add_widget(scroll); self.add_widget(self.layout)
     def on_pre_enter(self): self.lbl_week.text = f"WEEK {user_profile['current_week']}"
-    def next_week(self, *a): user_profile['current_week'] = (user_profile['current_week'] % 6) + 1; save_data(); self.on_pre_enter()
-    def prev_week(self, *a): user_profile['current_week'] = 6 if user_profile['current_week'] == 1 else user_profile['current_week']-1; save_data(); self.on_pre_enter()
+    def on_enter(self): log_draw_calls(self, 'home')
+    def next_week(self, *a): user_profile['current_week'] = (user_profile['current_week'] % CYCLE_WEEKS) + 1; save_data(); self.on_pre_enter()
+    def prev_week(self, *a): user_profile['current_week'] = CYCLE_WEEKS if user_profile['current_week'] == 1 else user_profile['current_week']-1; save_data(); self.on_pre_enter()
     def go_day(self, d): self.manager.get_screen('day').load_day(d); self.manager.transition.direction='left'; self.manager.current='day'
 
+day_rows_cache = {}  # (day, profile version) -> RecycleView data; save_data()/load_data() clear it
+
+def day_rows(day):
+    key = (day, profile_version(user_profile))
+    if key not in day_rows_cache:
+        day_rows_cache[key] = [{'viewclass': DayHeaderRow, 'text': e.text.upper(), 'row_size': (0, dp(40))} if e.kind == "section"
+                               else {'viewclass': DayItemRow, 'entry': e, 'row_size': (0, dp(90))} for e in plan.compile(day, user_profile)]
+    return day_rows_cache[key]
+
+class DayHeaderRow(RecycleDataViewBehavior, SectionHeader):
+    def __init__(self, **kwargs): super().__init__(text="", **kwargs)
+    def refresh_view_attrs(self, rv, index, data): self.text = data['text']
+
+class DayItemRow(RecycleDataViewBehavior, NeoCard):
+    """A NeoCard reused for whichever exercise line scrolls into view."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs); self.rv = None; self.data = {}
+        self.lbl = Label(font_size=dp(14), halign='left'); self.add_widget(self.lbl); text_layout.wrap(self.lbl, dp(120))
+        self.t_btn = NeoButton(text="TIME", size_hint_x=None, width=dp(60), background_color_hex=C_PRIMARY, color_hex="#000000")
+        self.t_btn.bind(on_release=self.on_timer)
+    def refresh_view_attrs(self, rv, index, data):
+        self.rv = rv; self.data = data; self.reset_vis()
+        e = data['entry']; self.lbl.text = e.text
+        self.command = (lambda: rv.screen.go_detail(e)) if e.exercise else None
+        if e.duration and self.t_btn.parent is None: self.add_widget(self.t_btn)
+        elif not e.duration and self.t_btn.parent is not None: self.remove_widget(self.t_btn)
+    def on_timer(self, *a):
+        dur, screen = self.data['entry'].duration, self.rv.screen
+        if dur == "AIRBIKE": screen.manager.current = 'airbike'
+        elif dur == "SIDEPLANK": screen.go_timer(60, "SIDEPLANK")
+        else: screen.go_timer(dur)
+
+class DayRowsLayout(TouchIndexed, RecycleBoxLayout): pass
+
+class DayList(RecycleView):
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs); self.screen = screen
+        layout = DayRowsLayout(orientation='vertical', spacing=dp(12), padding=dp(15), size_hint_y=None, default_size_hint=(1, None), key_size='row_size')
+        layout.bind(minimum_height=layout.setter('height')); CardBatch(layout); self.add_widget(layout)
+
 class DayScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -323,27 +385,11 @@ class DayScreen(Screen):
         btn_back = NeoButton(text="< BACK", size_hint_x=None, width=dp(80)); btn_back.bind(on_release=lambda x: setattr(self.manager, 'current', 'home'))
         self.lbl_title = Label(text="DAY", font_size=dp(24), bold=True); header.add_widget(btn_back); header.add_widget(self.lbl_title)
         self.layout.add_widget(header)
-        self.scroll = ScrollView(); self.content = GridLayout(cols=1, spacing=dp(12), size_hint_y=None, padding=dp(15))
-        self.content.bind(minimum_height=self.content.setter('height'))
-        self.scroll.add_widget(self.content); self.layout.add_widget(self.scroll); self.add_widget(self.layout)
+        self.scroll = DayList(self); self.layout.add_widget(self.scroll); self.add_widget(self.layout)  # recycled rows, data swapped per day
     def load_day(self, day):
-        self.lbl_title.text = day.upper(); self.content.clear_widgets()
-        for line in get_workout(day):
-            if any(x in line for x in ["WARMUP", "SUPERSET", "COOL", "COMBAT", "FINISHER", "CIRCUIT", "CARDIO", "MORNING"]):
-                self.content.add_widget(SectionHeader(text=line))
-            else:
-                ex_key = next((k for k in exercise_db if k in line), None)
-                dur = parse_duration(line)
-                card = NeoCard(command=(lambda x=ex_key, l=line: self.go_detail(x, l)) if ex_key else None)
-                card.add_widget(Label(text=line, font_size=dp(14), halign='left', text_size=(Window.width-dp(120), None)))
-                if dur:
-                    t_btn = NeoButton(text="TIME", size_hint_x=None, width=dp(60), background_color_hex=C_PRIMARY, color_hex="#000000")
-                    if dur == "AIRBIKE": t_btn.bind(on_release=lambda x: setattr(self.manager, 'current', 'airbike'))
-                    elif dur == "SIDEPLANK": t_btn.bind(on_release=lambda x: self.go_timer(60, "SIDEPLANK"))
-                    else: t_btn.bind(on_release=lambda x, t=dur: self.go_timer(t))
-                    card.add_widget(t_btn)
-                self.content.add_widget(card)
-    def go_detail(self, k, l): self.manager.get_screen('detail').load_ex(k, l); self.manager.current='detail'
+        self.lbl_title.text = day.upper(); self.scroll.data = day_rows(day); self.scroll.scroll_y = 1
+    def on_enter(self): log_draw_calls(self, 'day')
+    def go_detail(self, e): self.manager.get_screen('detail').load_entry(e); self.manager.current='detail'
     def go_timer(self, s, m="SIMPLE"): self.manager.get_screen('simple_timer').set_time(s, m); self.manager.current='simple_timer'
 
 class DetailScreen(Screen):
@@ -364,14 +410,85 @@ class DetailScreen(Screen):
         content.add_widget(SectionHeader(text="ASSIGNMENT")); content.add_widget(self.lbl_assign)
         content.add_widget(SectionHeader(text="EXECUTION")); content.add_widget(self.lbl_desc)
         content.add_widget(SectionHeader(text="CUE")); content.add_widget(self.lbl_cue)
+        for lbl in (self.lbl_assign, self.lbl_desc, self.lbl_cue): text_layout.wrap(lbl, dp(40), fit_height=dp(10))
         scroll.add_widget(content); self.layout.add_widget(scroll); self.add_widget(self.layout)
-    def load_ex(self, k, l):
-        d = exercise_db.get(k)
-        self.lbl_assign.text = f"[b]{l}[/b]"; self.lbl_assign.text_size=(Window.width-dp(40), None); self.lbl_assign.texture_update(); self.lbl_assign.height=self.lbl_assign.texture_size[1]+dp(10)
-        self.lbl_desc.text = d['desc']; self.lbl_desc.text_size=(Window.width-dp(40), None); self.lbl_desc.texture_update(); self.lbl_desc.height=self.lbl_desc.texture_size[1]+dp(10)
-        self.lbl_cue.text = f"[b]CUE:[/b] {d['cue']}"; self.lbl_cue.text_size=(Window.width-dp(40), None); self.lbl_cue.texture_update(); self.lbl_cue.height=self.lbl_cue.texture_size[1]+dp(10)
+    def load_entry(self, e):
+        d = exercise_db.get(e.exercise)
+        text_layout.set_text(self.lbl_assign, f"[b]{e.text}[/b]"); text_layout.set_text(self.lbl_desc, d['desc'])
+        text_layout.set_text(self.lbl_cue, f"[b]CUE:[/b] {d['cue']}")  # heights follow the rendered text, cached per width
+
+class RemoteTimer:
+    """Timer screen mixin for TIMER_SERVICE mode: the routine runs in the service
+    under the screen's name, the screen sends start/pause/resume and shows the
+    state the service broadcasts. Its own Clock interval only redraws the label.
+    A MIRROR=follow device drives it the same way from the leader's broadcasts.
+    Screens declare the routine_sim preset they run as remote_preset/remote_args."""
+    remote_event = None; remote_preset = None; remote_args = ()
+    def remote_toggle(self):
+        global remote_resume
+        remote_resume = False  # the user has picked up from here
+        st = remote.states.get(self.name)
+        if st and st["running"]: remote.send("pause", self.name)
+        elif st and not st["done"]: remote.send("resume", self.name)
+        else: remote.send("start", self.name, preset=self.remote_preset, args=list(self.remote_args))
+    def remote_leave(self):
+        st = remote.states.get(self.name)
+        if st and st["running"]: remote.send("pause", self.name)
+    def on_pre_enter(self, *a):
+        st = remote and remote.states.get(self.name)
+        if st: self.on_remote(st)
+    def remote_detach(self):
+        # The service is gone: stay on the shown step, paused, and time it locally from here
+        if self.remote_event: self.remote_event.cancel(); self.remote_event = None
+        if audio_manager: audio_manager.cancel(self)
+        self.running = False; self.timer.pause(); self.timer.paused_left = max(self.timer.paused_left, 0.0)
+        if self.timer.remaining: self.btn_main.text = "RESUME"
+        self.update_display()
+    def on_remote(self, msg):
+        if msg["ev"] == "cue":
+            if not audio_manager or remote.sounds: return
+            # Mirrored cues arrive ahead of time and are armed for their instant
+            if msg["due"] > time.monotonic(): audio_manager.schedule(msg["name"], msg["due"], key=self)
+            else: audio_manager.play(msg["name"], due=msg["due"])
+            return
+        if not msg["count"]:  # stopped
+            if self.remote_event: self.remote_event.cancel(); self.remote_event = None
+            return
+        # The deadline is on the shared monotonic clock, so the local timer just counts down to it
+        self.running = msg["running"]; self.timer.deadline = msg["deadline"]; self.timer.paused_left = max(msg["left"], 0.0)
+        if self.running and not self.remote_event: self.remote_event = Clock.schedule_interval(lambda dt: self.update_display(), TICK_INTERVAL)
+        elif not self.running and self.remote_event: self.remote_event.cancel(); self.remote_event = None
+        if not self.running and audio_manager: audio_manager.cancel(self)
+        self.show_remote(msg); self.update_display()
+
+remote_resume = False  # True from connecting until a session running in the service has been shown
+
+def on_remote_lost(msg):
+    global remote
+    sm = App.get_running_app().root
+    for screen in (sm.screens if sm else ()):
+        if isinstance(screen, RemoteTimer): screen.remote_detach()
+    # Reconnect (respawning the service if it died); sessions it still runs come back as state messages
+    on_event = remote.on_event; remote.close()
+    remote = timer_service.install(on_event)
+    if not remote: report_error(f"Timer service lost, timing here instead ({msg['error']})")
 
-class SimpleTimerScreen(Screen):
+def on_remote(msg):
+    global remote_resume
+    if msg["ev"] == "error": report_error(f"Timer service: {msg['error']}"); return
+    if msg["ev"] == "lost": on_remote_lost(msg); return
+    sm = App.get_running_app().root
+    if msg["ev"] == "hello": remote_resume = True
+    if msg["ev"] == "hello" or not sm: return
+    screen = sm._built(msg["key"])  # screens not built yet pick the state up in on_pre_enter
+    # Open the running session's screen once after (re)connecting; a follower always shows the leader's
+    follow = isinstance(remote, timer_mirror.MirrorFollower)
+    if msg["ev"] == "state" and msg["running"] and (remote_resume or follow) and sm.current != msg["key"]:
+        remote_resume = False; sm.current = msg["key"]
+    elif screen: screen.on_remote(msg)
+
+class SimpleTimerScreen(RemoteTimer, Screen):
+    remote_preset = "countdown"; remote_args = (0,)
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.layout = BoxLayout(orientation='vertical')
@@ -381,39 +498,50 @@ class SimpleTimerScreen(Screen):
         btn_back = NeoButton(text="< BACK", size_hint_x=None, width=dp(80)); btn_back.bind(on_release=lambda x: self.stop_go_back())
         self.lbl_status = Label(text="TIMER", bold=True); header.add_widget(btn_back); header.add_widget(self.lbl_status)
         self.layout.add_widget(header)
-        self.lbl_timer = Label(text="00:00", font_size=dp(100), bold=True)
+        self.lbl_timer = CountdownLabel(text="00:00", font_size=dp(100), bold=True)
         self.layout.add_widget(self.lbl_timer)
         controls = BoxLayout(size_hint_y=None, height=dp(120), padding=dp(20), spacing=dp(20))
         self.btn_main = NeoButton(text="START", background_color_hex=COLOR_SPRINT_HEX, color_hex="#000000")
         self.btn_main.bind(on_release=self.toggle); controls.add_widget(self.btn_main)
         self.layout.add_widget(controls); self.add_widget(self.layout)
-        self.total = 0; self.curr = 0; self.running = False; self.event = None; self.mode = "SIMPLE"; self.phase = 0
+        self.total = 0; self.timer = DeadlineTimer(); self.running = False; self.event = None; self.mode = "SIMPLE"; self.phase = 0
     def set_time(self, s, m="SIMPLE"):
-        self.total = s; self.mode = m; self.curr = s; self.running = False; self.phase = 0
+        self.total = s; self.mode = m; self.running = False; self.phase = 0
         if self.event: self.event.cancel()
+        self.remote_preset = "side_plank" if m == "SIDEPLANK" else "countdown"; self.remote_args = (s,)
+        if remote and self.name in remote.states: remote.send("stop", self.name)
+        self.timer.stop(); self.timer.set(s)
         self.lbl_status.text = "SIDE 1 (L)" if m == "SIDEPLANK" else "TIMER"; self.update_display()
+    def show_remote(self, msg):
+        self.lbl_status.text = msg["label"]; self.btn_main.text = "PAUSE" if msg["running"] else "START" if msg["done"] else "RESUME"
     def toggle(self, *a):
-        if self.running: self.running = False; self.btn_main.text = "RESUME"; self.event.cancel()
-        else: self.running = True; self.btn_main.text = "PAUSE"; self.event = Clock.schedule_interval(self.update, 1)
+        if remote: self.remote_toggle(); return
+        if self.running: self.running = False; self.btn_main.text = "RESUME"; self.event.cancel(); self.timer.pause()
+        else: self.running = True; self.btn_main.text = "PAUSE"; self.timer.start(); self.event = Clock.schedule_interval(self.update, TICK_INTERVAL)
     def update(self, dt):
-        self.curr -= 1
-        if self.curr <= 0:
+        if timing: timing.tick('simple_timer', self.timer)
+        # Side plank phases chain onto the previous deadline, so a late tick never stretches a side
+        while self.running and self.timer.expired:
+            ended = self.timer.deadline
             if self.mode == "SIDEPLANK" and self.phase == 0:
-                self.phase = 1; self.curr = 10; self.lbl_status.text = "BREAK"
-                if audio_manager: audio_manager.play('buzzer')
+                self.phase = 1; self.timer.advance(10); self.lbl_status.text = "BREAK"
+                if audio_manager: audio_manager.play('buzzer', due=ended)
             elif self.mode == "SIDEPLANK" and self.phase == 1:
-                self.phase = 2; self.curr = self.total; self.lbl_status.text = "SIDE 2 (R)"
-                if audio_manager: audio_manager.play('beep')
+                self.phase = 2; self.timer.advance(self.total); self.lbl_status.text = "SIDE 2 (R)"
+                if audio_manager: audio_manager.play('beep', due=ended)
             else:
-                self.running = False; self.event.cancel(); self.lbl_status.text = "DONE"
-                if audio_manager: audio_manager.play('beep')
+                self.running = False; self.event.cancel(); self.timer.stop(); self.lbl_status.text = "DONE"
+                if audio_manager: audio_manager.play('beep', due=ended)
         self.update_display()
-    def update_display(self): m, s = divmod(self.curr, 60); self.lbl_timer.text = f"{m:02d}:{s:02d}"
+    def update_display(self): self.lbl_timer.text = format_mmss(self.timer.seconds_left())
     def stop_go_back(self):
+        if remote: self.remote_leave()
         if self.event: self.event.cancel()
+        self.timer.pause()
         self.manager.current = 'day'
 
-class AirBikeScreen(Screen):
+class AirBikeScreen(RemoteTimer, Screen):
+    remote_preset = "bjj_rehab"
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.layout = BoxLayout(orientation='vertical')
@@ -423,46 +551,72 @@ class AirBikeScreen(Screen):
         btn_back = NeoButton(text="<", size_hint_x=None, width=dp(50)); btn_back.bind(on_release=lambda x: self.stop_go_back())
         header.add_widget(btn_back); header.add_widget(Label(text="AIR BIKE", bold=True)); self.layout.add_widget(header)
         self.lbl_info = Label(text="READY?", font_size=dp(20), color=get_color_from_hex(C_PRIMARY))
-        self.lbl_timer = Label(text="20:00", font_size=dp(80), bold=True)
+        self.lbl_timer = CountdownLabel(text="20:00", font_size=dp(80), bold=True)
         self.layout.add_widget(self.lbl_info); self.layout.add_widget(self.lbl_timer)
         controls = BoxLayout(size_hint_y=None, height=dp(100), padding=dp(20), spacing=dp(20))
         self.btn_main = NeoButton(text="START", background_color_hex=COLOR_SPRINT_HEX, color_hex="#000000")
         self.btn_main.bind(on_release=self.toggle); controls.add_widget(self.btn_main)
         self.layout.add_widget(controls); self.add_widget(self.layout)
-        self.routine = self._build(); self.idx = 0; self.curr = 0; self.event = None
-    def _build(self):
-        r = [("READY", 5, "GET READY"), ("WARMUP", 150, "WARM UP: BUILD (50-60%)"), ("SPRINT", 5, "SPRINT: 80-90%")]
-        r += [("WARMUP", 25, "WARM UP"), ("SPRINT", 5, "SPRINT"), ("WARMUP", 25, "WARM UP"), ("SPRINT", 5, "SPRINT"), ("WARMUP", 25, "WARM UP")]
-        r += [("WORK", 90, "PHASE 1: 70% THRESHOLD"), ("SPRINT", 15, "PHASE 1: 90% SPRINT"), ("WORK", 75, "PHASE 1: 70%")]
-        r += [("SPRINT", 15, "ARMS ONLY"), ("WORK", 45, "HEAVY GRIND"), ("SPRINT", 15, "ARMS ONLY"), ("WORK", 45, "HEAVY GRIND")]
-        for i in range(1, 5): r += [("SPRINT", 20, f"PHASE 3: SPRINT {i}/4"), ("WARMUP", 10, f"PHASE 3: CRUISE")]
-        r += [("REST", 120, "RECOVERY: 40%")]
-        for i in range(1, 5): r += [("SPRINT", 20, f"INTERVAL {i}/4 MAX"), ("REST", 40, f"REST")]
-        r += [("WARMUP", 180, "COOLDOWN: LIGHT FLUSH"), ("DONE", 0, "COMPLETE")]
-        return r
+        self.routine = RoutineTimeline(self._build()); self.idx = 0; self.timer = DeadlineTimer(); self.event = None; self.done = False
+        self.routine_id = routine_id(self.routine)
+    def _build(self): return routines.load_routine("bjj_rehab")
+    def log_event(self, kind, t=None):
+        if not event_log: return
+        try: event_log.append(kind, self.routine_id, self.idx, self.routine[self.idx][2], t)
+        except Exception as e: print(f"Session log failed: {e}")
+    def publish(self):
+        if not mirror: return
+        mirror.publish({"key": self.name, "preset": self.remote_preset, "args": list(self.remote_args), "idx": self.idx, "count": len(self.routine),
+                        "running": self.timer.running, "deadline": self.timer.deadline, "left": self.timer.remaining,
+                        "done": self.done})
+    def show_remote(self, msg):
+        self.idx = msg["idx"]; self.lbl_info.text = "DONE" if msg["done"] else msg["label"]
+        self.btn_main.text = "STOP" if msg["running"] else "START" if msg["done"] else "RESUME"
+        # With TIMER_SERVICE the service's state is what followers mirror (same monotonic clock)
+        if mirror: mirror.publish(dict(msg, args=list(self.remote_args)))
     def toggle(self, *a):
-        if self.event: self.event.cancel(); self.event=None; self.btn_main.text="RESUME"
+        if remote: self.remote_toggle(); return
+        if self.event: self.event.cancel(); self.event=None; self.timer.pause(); self.cancel_cue(); self.btn_main.text="RESUME"; self.log_event(events.PAUSE)
         else:
-            self.btn_main.text="STOP"
-            if self.curr == 0: self.load_step()
-            self.event = Clock.schedule_interval(self.update, 1)
-    def load_step(self):
-        t, d, i = self.routine[self.idx]; self.curr = d; self.lbl_info.text = i; self.update_display()
+            self.btn_main.text="STOP"; fresh = self.timer.remaining == 0
+            if fresh: self.done = False; self.load_step()
+            self.timer.start(); self.arm_cue(); self.log_event(events.START if fresh else events.RESUME)
+            self.event = Clock.schedule_interval(self.update, TICK_INTERVAL)
+        self.publish()
+    def load_step(self, chained=False):
+        t, d, i = self.routine[self.idx]; self.lbl_info.text = i
+        # Auto-advance chains onto the previous deadline so late ticks never add up
+        if chained: self.timer.advance(d); self.publish()
+        else: self.timer.set(d); self.cancel_cue()
+        self.update_display(); self.arm_cue()
+    def arm_cue(self):
+        # The next step's beep fires on this step's deadline, not on the tick that notices it;
+        # steps already over (caught up after a stall) arm nothing
+        if audio_manager and self.timer.running and not self.timer.expired and self.idx < len(self.routine) - 1:
+            audio_manager.countdown('countdown', self.timer.deadline, key=self)  # 3-2-1 into the next step
+            audio_manager.schedule('beep', self.timer.deadline, key=self)
+    def cancel_cue(self):
+        if audio_manager: audio_manager.cancel(self)
     def update(self, dt):
-        self.curr -= 1
-        if self.curr < 0:
-            self.idx += 1
-            if self.idx < len(self.routine):
-                self.load_step()
-                if audio_manager: audio_manager.play('beep')
-            else: self.event.cancel(); self.lbl_info.text="DONE"
+        if timing: timing.tick('airbike', self.timer)
+        while self.event and self.timer.expired:
+            # Like the other apps: FINISH is logged on entering the DONE step, which never runs itself
+            if self.idx == len(self.routine) - 1: self.finish_workout(); break
+            self.log_event(events.STEP_DONE, events.wall_time(self.timer.deadline)); self.idx += 1
+            if self.routine[self.idx][0] == "DONE": self.finish_workout(); break
+            self.load_step(chained=True)
         self.update_display()
-    def update_display(self): m, s = divmod(self.curr, 60); self.lbl_timer.text = f"{m:02d}:{s:02d}"
+    def finish_workout(self):
+        self.log_event(events.FINISH)
+        self.event.cancel(); self.event = None; self.timer.stop(); self.idx = 0; self.done = True; self.lbl_info.text="DONE"; self.btn_main.text="START"; self.publish()
+    def update_display(self): self.lbl_timer.text = format_mmss(self.timer.seconds_left())
     def stop_go_back(self):
-        if self.event: self.event.cancel()
+        if remote: self.remote_leave()
+        if self.event: self.event.cancel(); self.event = None; self.btn_main.text = "RESUME"; self.log_event(events.EXIT)
+        self.timer.pause(); self.cancel_cue(); self.publish()
         self.manager.current = 'home'
 
-class Loop30Screen(Screen):
+class Loop30Screen(RemoteTimer, Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.layout = BoxLayout(orientation='vertical')
@@ -477,29 +631,48 @@ class Loop30Screen(Screen):
         self.in_rest = TextInput(text="2", multiline=False, input_filter='int', background_color=(0,0,0,1), foreground_color=(1,1,1,1))
         inputs.add_widget(Label(text="W:")); inputs.add_widget(self.in_work); inputs.add_widget(Label(text="R:")); inputs.add_widget(self.in_rest)
         self.layout.add_widget(inputs)
-        self.lbl_timer = Label(text="00:30", font_size=dp(80), bold=True); self.layout.add_widget(self.lbl_timer)
+        self.lbl_timer = CountdownLabel(text="00:30", font_size=dp(80), bold=True); self.layout.add_widget(self.lbl_timer)
         controls = BoxLayout(size_hint_y=None, height=dp(100), padding=dp(20))
         self.btn_main = NeoButton(text="START", background_color_hex=COLOR_SPRINT_HEX, color_hex="#000000")
         self.btn_main.bind(on_release=self.toggle); controls.add_widget(self.btn_main)
         self.layout.add_widget(controls); self.add_widget(self.layout)
-        self.curr = 30; self.running = False; self.event = None; self.phase = "WORK"
+        self.timer = DeadlineTimer(); self.timer.set(30); self.running = False; self.event = None; self.phase = "WORK"
+    # Lets SwipeManager evict this screen while idle and rebuild it as it was
+    def is_idle(self): return not self.running
+    def get_state(self): return {"work": self.in_work.text, "rest": self.in_rest.text, "phase": self.phase, "left": self.timer.remaining}
+    def set_state(self, st):
+        self.in_work.text = st["work"]; self.in_rest.text = st["rest"]; self.phase = st["phase"]
+        self.timer.set(st["left"]); self.lbl_timer.text = format_mmss(self.timer.seconds_left())
+        full = max(int((self.in_work.text if self.phase == "WORK" else self.in_rest.text) or 0), 1)
+        if 0 < st["left"] < full: self.btn_main.text = "RESUME"  # rebuilt partway through a phase
+    remote_preset = "loop"
+    @property
+    def remote_args(self): return max(int(self.in_work.text or 0), 1), max(int(self.in_rest.text or 0), 1)
+    def show_remote(self, msg): self.phase = msg["type"]; self.btn_main.text = "STOP" if msg["running"] else "RESUME"
+    def update_display(self): self.lbl_timer.text = format_mmss(self.timer.seconds_left())
     def toggle(self, *a):
-        if self.running: self.running = False; self.event.cancel(); self.btn_main.text = "RESUME"
-        else: self.running = True; self.btn_main.text = "STOP"; self.event = Clock.schedule_interval(self.update, 1)
+        if remote: self.remote_toggle(); return
+        if self.running: self.running = False; self.event.cancel(); self.timer.pause(); self.btn_main.text = "RESUME"
+        else: self.running = True; self.btn_main.text = "STOP"; self.timer.start(); self.event = Clock.schedule_interval(self.update, TICK_INTERVAL)
     def update(self, dt):
-        self.curr -= 1
-        if self.curr < 0:
+        if timing: timing.tick('loop30', self.timer)
+        # Each phase starts where the previous deadline ended, so late ticks never drift
+        while self.timer.expired:
+            ended = self.timer.deadline
             if self.phase == "WORK":
                 self.phase = "REST"
-                self.curr = int(self.in_rest.text)
-                if audio_manager: audio_manager.play('buzzer')
+                self.timer.advance(max(int(self.in_rest.text), 1))
+                if audio_manager: audio_manager.play('buzzer', due=ended)
             else:
                 self.phase = "WORK"
-                self.curr = int(self.in_work.text)
-                if audio_manager: audio_manager.play('beep')
-        m, s = divmod(self.curr, 60); self.lbl_timer.text = f"{m:02d}:{s:02d}"
+                self.timer.advance(max(int(self.in_work.text), 1))
+                if audio_manager: audio_manager.play('beep', due=ended)
+        self.update_display()
     def stop_go_back(self):
+        if remote: self.remote_leave()
         if self.event: self.event.cancel()
+        if self.running: self.running = False; self.btn_main.text = "RESUME"  # evictable again once left
+        self.timer.pause()
         self.manager.current = 'home'
 
 class EditScreen(Screen):
@@ -530,14 +703,41 @@ class EditScreen(Screen):
 
 class RehabApp(App):
     def build(self):
-        global audio_manager; audio_manager = SoundManager()
-        load_data(); sm = SwipeManager()
-        sm.add_widget(HomeScreen(name='home')); sm.add_widget(DayScreen(name='day'))
-        sm.add_widget(DetailScreen(name='detail')); sm.add_widget(EditScreen(name='edit'))
-        sm.add_widget(AirBikeScreen(name='airbike')); sm.add_widget(SimpleTimerScreen(name='simple_timer'))
-        sm.add_widget(Loop30Screen(name='loop30'))
+        global audio_manager, profile_writer, event_log, timing
+        profile_writer = ProfileWriter(DATA_FILE, on_error=lambda e: Clock.schedule_once(lambda dt: report_error(f"Profile not saved: {e}")))
+        with stage("SoundManager()"): audio_manager = SoundManager()
+        timing = timing_hud.install(self.user_data_dir)
+        if timing: audio_manager.on_play = timing.cue
+        try: event_log = events.SessionLog(SESSION_LOG_DIR)
+        except Exception as e: print(f"Session log unavailable: {e}")
+        with stage("load_data()"): load_data()
+        sm = SwipeManager()
+        with stage("screen home"): sm.add_widget(HomeScreen(name='home'))  # the rest are built on first visit
+        sm.register_screen('day', DayScreen); sm.register_screen('detail', DetailScreen)
+        sm.register_screen('edit', EditScreen, evictable=True); sm.register_screen('airbike', AirBikeScreen)
+        sm.register_screen('simple_timer', SimpleTimerScreen); sm.register_screen('loop30', Loop30Screen, evictable=True)
         return sm
-    def on_stop(self): save_data()
+    def on_start(self):
+        global eco, remote, mirror
+        eco = eco_mode.install()  # slows the loop whenever no timer or animation is running
+        # Messages arrive on the client's reader thread
+        on_event = lambda msg: Clock.schedule_once(lambda dt: on_remote(msg))
+        remote = timer_service.install(on_event) or timer_mirror.follower(on_event)
+        mirror = timer_mirror.leader()
+        startup_profile.report_after_first_frame('bjj-rehab')
+    def on_stop(self):
+        save_data(); profile_writer.close()
+        if event_log: event_log.close()
+        if timing: timing.export()
+        if eco: eco.report()
+        if audio_manager: audio_manager.report()
+        if remote: remote.close()  # the service keeps the routines running
+        if mirror: mirror.close()
+    def on_pause(self):
+        profile_writer.flush()
+        if timing: timing.export()
+        return True
 
 if __name__ == '__main__':
     RehabApp().run()
+    startup_profile.finish()
@@ -0,0 +1,230 @@
+import os
+
+from kivy.clock import Clock
+from kivy.graphics import Color, InstructionGroup, Line, Mesh, Rectangle
+from kivy.graphics.instructions import VertexInstruction
+from kivy.uix.relativelayout import RelativeLayout
+from kivy.uix.scrollview import ScrollView
+
+SHADOW, FILL, BORDER = range(3)
+QUADS = {SHADOW: 1, FILL: 1, BORDER: 4}
+
+
+class Layer:
+    """One colour of one kind of shape (shadow, fill or border) as a single mesh.
+
+    Every shape owns a fixed-size slot of quads. Removing a shape moves the last
+    slot into its place, so the vertex list never has holes.
+    """
+
+    def __init__(self, rgba, kind):
+        self.per_key = QUADS[kind] * 16
+        self.keys = []
+        self.slots = {}
+        self.verts = []
+        self.color = Color(*rgba)
+        self.mesh = Mesh(mode='triangles')
+
+    def set(self, key, floats):
+        i = self.slots.get(key)
+        if i is None:
+            self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            self.verts.extend(floats)
+        else:
+            start = i * self.per_key
+            self.verts[start:start + self.per_key] = floats
+
+    def remove(self, key):
+        i = self.slots.pop(key, None)
+        if i is None:
+            return
+        last = len(self.keys) - 1
+        if i != last:
+            moved = self.keys[last]
+            self.keys[i] = moved
+            self.slots[moved] = i
+            self.verts[i * self.per_key:(i + 1) * self.per_key] = self.verts[last * self.per_key:]
+        self.keys.pop()
+        del self.verts[last * self.per_key:]
+
+    def flush(self, indices):
+        quads = len(self.verts) // 16
+        self.mesh.vertices = self.verts
+        self.mesh.indices = indices[:quads * 6]
+
+
+def quad(x, y, w, h):
+    return [x, y, 0, 0, x + w, y, 1, 0, x + w, y + h, 1, 1, x, y + h, 0, 1]
+
+
+def border_quads(x, y, w, h, t):
+    # Same footprint as Line(rectangle=..., width=t): t either side of each edge
+    return (quad(x - t, y - t, w + 2 * t, 2 * t) + quad(x - t, y + h - t, w + 2 * t, 2 * t)
+            + quad(x - t, y + t, 2 * t, h - 2 * t) + quad(x + w - t, y + t, 2 * t, h - 2 * t))
+
+
+class CardBatch:
+    """Draws the shadow, fill and border of every card in a list container.
+
+    A handful of meshes replaces three instructions per card. Layers are ordered
+    by nesting depth, then shadow < fill < border, so a button inside a card
+    still draws over that card. Geometry changes are coalesced into one upload
+    per frame.
+    """
+
+    def __init__(self, container):
+        self.group = InstructionGroup()
+        container.canvas.before.add(self.group)
+        container.card_batch = self
+        self.layers = {}
+        self.order = []
+        self.owned = {}  # shape -> [layer key, ...]
+        self.indices = []
+        self._trigger = Clock.create_trigger(self.flush)
+
+    def _layer(self, depth, kind, rgba):
+        key = (depth, kind, tuple(rgba))
+        layer = self.layers.get(key)
+        if layer is None:
+            # Rebuild the group so the new layer lands in draw order
+            layer = self.layers[key] = Layer(rgba, kind)
+            self.order = sorted(self.layers)
+            self.group.clear()
+            for k in self.order:
+                self.group.add(self.layers[k].color)
+                self.group.add(self.layers[k].mesh)
+        return layer
+
+    def update(self, shape, depth):
+        s = shape
+        x, y, w, h = s.x, s.y, s.width, s.height
+        keys = [(depth, SHADOW, tuple(s.shape_shadow)), (depth, FILL, tuple(s.shape_fill)), (depth, BORDER, tuple(s.shape_border))]
+        for old in self.owned.get(shape, ()):
+            if old not in keys:
+                self.layers[old].remove(shape)
+        self.owned[shape] = keys
+        so, fo = s.shadow_offset, s.fill_offset
+        self._layer(depth, SHADOW, s.shape_shadow).set(shape, quad(x + so, y - so, w, h))
+        self._layer(depth, FILL, s.shape_fill).set(shape, quad(x + fo, y - fo, w, h))
+        self._layer(depth, BORDER, s.shape_border).set(shape, border_quads(x, y, w, h, s.border_width))
+        self._trigger()
+
+    def remove(self, shape):
+        for key in self.owned.pop(shape, ()):
+            self.layers[key].remove(shape)
+        self._trigger()
+
+    def flush(self, *args):
+        quads = max((len(l.verts) // 16 for l in self.layers.values()), default=0)
+        while len(self.indices) < quads * 6:
+            b = len(self.indices) // 6 * 4
+            self.indices.extend((b, b + 1, b + 2, b, b + 2, b + 3))
+        for layer in self.layers.values():
+            layer.flush(self.indices)
+
+
+def find_batch(widget):
+    """(CardBatch, nesting depth) of the nearest container sharing widget's coordinates."""
+    depth = 0
+    p = widget.parent
+    while p is not None:
+        batch = getattr(p, 'card_batch', None)
+        if batch is not None:
+            return batch, depth
+        if isinstance(p, (RelativeLayout, ScrollView)):
+            break  # coordinates change past here
+        if isinstance(p, BatchedShape):
+            depth += 1
+        p = p.parent
+    return None, 0
+
+
+class BatchedShape:
+    """Mixin for widgets drawn as a drop shadow, a fill and a border.
+
+    Inside a container with a CardBatch the shape joins the batch's meshes;
+    anywhere else it draws its own Rectangle/Rectangle/Line like before.
+    """
+
+    shadow_offset = 4
+    border_width = 1.5
+
+    def init_shape(self, fill, border, shadow=(0, 0, 0, 1)):
+        self.shape_fill = fill
+        self.shape_border = border
+        self.shape_shadow = shadow
+        self.fill_offset = 0
+        self.batch = None
+        self.batch_depth = 0
+        self.own = None
+        self.bind(pos=self.update_ui, size=self.update_ui, parent=self.attach_shape)
+
+    def attach_shape(self, *args):
+        batch, depth = find_batch(self) if self.parent is not None else (None, 0)
+        if batch is not self.batch and self.batch is not None:
+            self.batch.remove(self)
+        self.batch, self.batch_depth = batch, depth
+        if batch is not None and self.own is not None:
+            self.canvas.before.remove(self.own)
+            self.own = None
+        elif batch is None and self.parent is not None and self.own is None:
+            self.own = InstructionGroup()
+            self.own_shadow_color = Color(*self.shape_shadow)
+            self.own_shadow = Rectangle()
+            self.own_fill_color = Color(*self.shape_fill)
+            self.own_fill = Rectangle()
+            self.own_border_color = Color(*self.shape_border)
+            self.own_border = Line(width=self.border_width)
+            for instr in (self.own_shadow_color, self.own_shadow, self.own_fill_color, self.own_fill, self.own_border_color, self.own_border):
+                self.own.add(instr)
+            self.canvas.before.insert(0, self.own)
+        # Nested shapes (a button on a card) follow their card into or out of a batch
+        for child in self.children:
+            if isinstance(child, BatchedShape):
+                child.attach_shape()
+        self.update_ui()
+
+    def set_fill(self, rgba=None, offset=0):
+        if rgba is not None:
+            self.shape_fill = rgba
+        self.fill_offset = offset
+        self.update_ui()
+
+    def update_ui(self, *args):
+        if self.batch is not None:
+            self.batch.update(self, self.batch_depth)
+        elif self.own is not None:
+            so, fo = self.shadow_offset, self.fill_offset
+            self.own_shadow.pos = (self.x + so, self.y - so); self.own_shadow.size = self.size
+            self.own_fill_color.rgba = self.shape_fill
+            self.own_fill.pos = (self.x + fo, self.y - fo); self.own_fill.size = self.size
+            self.own_border.rectangle = (self.x, self.y, self.width, self.height)
+
+
+def count_draw_calls(widget):
+    """Vertex instructions (one GL draw each) in widget's subtree."""
+    total = 0
+    stack = [widget]
+    while stack:
+        w = stack.pop()
+        for canvas in (w.canvas.before, w.canvas, w.canvas.after):
+            total += _count(canvas)
+        stack.extend(w.children)
+    return total
+
+
+def _count(group):
+    n = 0
+    for instr in group.children:
+        if isinstance(instr, VertexInstruction):
+            n += 1
+        elif isinstance(instr, InstructionGroup):
+            n += _count(instr)
+    return n
+
+
+def log_draw_calls(screen, name):
+    """With DRAW_CALLS=1 set, print the screen's draw calls once it has laid out."""
+    if os.environ.get("DRAW_CALLS"):
+        Clock.schedule_once(lambda dt: print(f"[draw calls] {name}: {count_draw_calls(screen)}"), 0.5)
@@ -0,0 +1,90 @@
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Rectangle
+from kivy.properties import StringProperty, NumericProperty, BooleanProperty, ListProperty
+from kivy.uix.widget import Widget
+
+GLYPHS = "0123456789:-"
+
+_atlases = {}
+
+
+class GlyphAtlas:
+    """All countdown glyphs rendered once into a single texture.
+
+    Each glyph is a region of that texture, so showing a new time only swaps
+    which region a Rectangle samples from; nothing is re-rasterised.
+    """
+
+    def __init__(self, font_size, bold=False, font_name='Roboto'):
+        core = CoreLabel(text=GLYPHS, font_size=font_size, bold=bold, font_name=font_name)
+        core.refresh()
+        self.texture = core.texture
+        self.height = self.texture.height
+        self.regions = {}
+        x = 0
+        for i, ch in enumerate(GLYPHS):
+            end = core.get_extents(GLYPHS[:i + 1])[0]
+            self.regions[ch] = self.texture.get_region(x, 0, end - x, self.height)
+            x = end
+        # Digits share one cell width so the countdown doesn't wobble
+        self.digit_width = max(self.regions[d].width for d in "0123456789")
+
+    def cell(self, ch):
+        return self.digit_width if ch.isdigit() else self.regions[ch].width
+
+
+def get_atlas(font_size, bold=False, font_name='Roboto'):
+    key = (round(font_size), bold, font_name)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(key[0], bold, font_name)
+    return atlas
+
+
+class CountdownLabel(Widget):
+    """Drop-in for the big MM:SS timer Label, drawn from a GlyphAtlas."""
+
+    text = StringProperty("")
+    font_size = NumericProperty('15sp')
+    bold = BooleanProperty(False)
+    font_name = StringProperty('Roboto')
+    color = ListProperty([1, 1, 1, 1])
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.atlas = None
+        self.slots = []
+        with self.canvas:
+            self.color_instr = Color(*self.color)
+        self.bind(font_size=self._load_atlas, bold=self._load_atlas, font_name=self._load_atlas)
+        self.bind(pos=self._layout, size=self._layout, text=self._layout)
+        self.bind(color=self._update_color)
+        self._load_atlas()
+
+    def _update_color(self, *args):
+        self.color_instr.rgba = self.color
+
+    def _load_atlas(self, *args):
+        self.atlas = get_atlas(self.font_size, self.bold, self.font_name)
+        self._layout()
+
+    def _layout(self, *args):
+        if self.atlas is None:
+            return
+        regions = self.atlas.regions
+        chars = [c for c in self.text if c in regions]
+        while len(self.slots) < len(chars):
+            with self.canvas:
+                self.slots.append(Rectangle())
+        while len(self.slots) > len(chars):
+            self.canvas.remove(self.slots.pop())
+
+        x = self.center_x - sum(self.atlas.cell(c) for c in chars) / 2.
+        y = self.center_y - self.atlas.height / 2.
+        for rect, ch in zip(self.slots, chars):
+            region = regions[ch]
+            cell = self.atlas.cell(ch)
+            rect.texture = region
+            rect.size = region.size
+            rect.pos = (int(x + (cell - region.width) / 2.), int(y))
+            x += cell
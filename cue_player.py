@@ -0,0 +1,119 @@
+import time
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.core.audio import SoundLoader
+
+from deadline_timer import CUE_LATE_LIMIT
+
+
+class CuePlayer:
+    """Sound cues with a small pool of pre-loaded voices per cue.
+
+    Back-to-back or overlapping cues (a 3-2-1 countdown, a beep right after a
+    buzzer) each get their own voice instead of stopping the one playing.
+    Cues can be armed ahead of time for an absolute time.monotonic() instant,
+    and every play records how late it started relative to when it was due.
+    """
+
+    def __init__(self, voices=3):
+        self.voice_count = voices
+        self.voices = {}
+        self.cursor = {}
+        self.pending = {}
+        self.latencies = deque(maxlen=100)
+        self.on_play = None  # on_play(name, latency) after every cue, e.g. for timing_hud
+
+    def load(self, name, path):
+        pool = []
+        for _ in range(self.voice_count):
+            sound = SoundLoader.load(path)
+            if sound:
+                self._prime(sound)
+                pool.append(sound)
+        if pool:
+            self.voices[name] = pool
+            self.cursor[name] = 0
+        return bool(pool)
+
+    def _prime(self, sound):
+        # A silent play/stop opens the audio device and decoder now, so the
+        # first real cue doesn't pay for it
+        try:
+            sound.volume = 0
+            sound.play()
+            sound.stop()
+            sound.seek(0)
+        except Exception:
+            pass
+        sound.volume = 1
+
+    def _voice(self, name):
+        pool = self.voices.get(name)
+        if not pool:
+            return None
+        start = self.cursor[name]
+        for i in range(len(pool)):
+            sound = pool[(start + i) % len(pool)]
+            if sound.state != 'play':
+                self.cursor[name] = (start + i + 1) % len(pool)
+                return sound
+        # Every voice busy: reuse the one that started longest ago
+        self.cursor[name] = (start + 1) % len(pool)
+        return pool[start]
+
+    def play(self, name, due=None):
+        sound = self._voice(name)
+        if not sound:
+            return
+        t0 = time.monotonic()
+        try:
+            if sound.state == 'play':
+                sound.stop()
+            sound.play()
+        except Exception:
+            return
+        t1 = time.monotonic()
+        latency = (t0 - due if due is not None else 0) + (t1 - t0)
+        self.latencies.append(latency)
+        if self.on_play:
+            self.on_play(name, latency)
+
+    def schedule(self, name, at, key=None):
+        """Arm a cue to fire at monotonic time at. Returns None for a cue already
+        more than CUE_LATE_LIMIT past due (a step skipped over after a stall)."""
+        if at < time.monotonic() - CUE_LATE_LIMIT:
+            return None
+        events = self.pending.setdefault(key, [])
+
+        def fire(dt):
+            if event in events:
+                events.remove(event)
+            self.play(name, due=at)
+
+        event = Clock.schedule_once(fire, max(at - time.monotonic(), 0))
+        events.append(event)
+        return event
+
+    def countdown(self, name, at, count=3, key=None):
+        """Arm count overlapping cues one second apart, ending a second before at."""
+        for i in range(count, 0, -1):
+            if at - i > time.monotonic():
+                self.schedule(name, at - i, key)
+
+    def cancel(self, key=None):
+        for event in self.pending.pop(key, []):
+            event.cancel()
+
+    def report(self):
+        stats = self.latency_stats()
+        print(f"[cues] {stats['count']} played, late mean {stats['mean_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+
+    def latency_stats(self):
+        """Trigger-to-play latency of recent cues, in milliseconds."""
+        if not self.latencies:
+            return {"count": 0, "mean_ms": 0.0, "max_ms": 0.0}
+        values = list(self.latencies)
+        return {"count": len(values),
+                "mean_ms": 1000 * sum(values) / len(values),
+                "max_ms": 1000 * max(values)}
@@ -0,0 +1,86 @@
+import math
+import time
+
+# How often the screens poll the timer. The countdown itself is driven by
+# absolute deadlines, so this only bounds how late a label can refresh.
+TICK_INTERVAL = 0.1
+# A cue armed this long after it was due is dropped rather than played late
+CUE_LATE_LIMIT = 0.3
+
+
+class DeadlineTimer:
+    """Countdown that works from an absolute deadline on the monotonic clock.
+
+    Late or dropped Clock callbacks never add up: the remaining time is always
+    recomputed from the deadline, and chaining the next phase with advance()
+    starts it exactly where the previous one ended.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.deadline = None   # absolute time while running
+        self.paused_left = 0.0  # time left while paused (keeps the sub-second part)
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    @property
+    def remaining(self):
+        """Seconds left as a float. Negative once the deadline has passed."""
+        if self.deadline is None:
+            return self.paused_left
+        return self.deadline - self.clock()
+
+    @property
+    def expired(self):
+        return self.remaining <= 0
+
+    def seconds_left(self):
+        """Whole seconds to show on a countdown label (10 -> 1, then 0)."""
+        return max(0, int(math.ceil(self.remaining - 1e-6)))
+
+    def set(self, duration):
+        """Restart the countdown at duration seconds from now."""
+        if self.deadline is None:
+            self.paused_left = float(duration)
+        else:
+            self.deadline = self.clock() + duration
+
+    def advance(self, duration):
+        """Chain the next phase onto the previous deadline instead of now."""
+        if self.deadline is None:
+            self.paused_left += duration
+        else:
+            self.deadline += duration
+
+    def start(self):
+        if self.deadline is None:
+            self.deadline = self.clock() + self.paused_left
+
+    def pause(self):
+        if self.deadline is not None:
+            self.paused_left = self.deadline - self.clock()
+            self.deadline = None
+
+    def stop(self):
+        self.deadline = None
+        self.paused_left = 0.0
+
+
+class VirtualClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self, t=0.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+    def advance(self, dt):
+        self.t += dt
+
+
+def format_mmss(seconds):
+    m, s = divmod(seconds, 60)
+    return f"{m:02d}:{s:02d}"
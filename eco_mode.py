@@ -0,0 +1,97 @@
+import os
+import time
+
+from kivy.animation import Animation
+from kivy.clock import Clock
+from kivy.core.window import Window
+
+from deadline_timer import TICK_INTERVAL
+
+ENV = "ECO_MODE"  # 0 to keep full frame rate always
+REPORT_ENV = "ECO_REPORT"  # 1 to print wakeups per minute every minute
+FULL, ECO = "full", "eco"
+
+
+class EcoMode:
+    """Drops the main loop's frame rate while nothing on screen is moving.
+
+    Kivy already skips redraws when no canvas changed, but its loop still
+    wakes maxfps times a second. Once there has been no input for `linger`
+    seconds, no Animation is running and no fast Clock interval is scheduled
+    (a timer screen's tick, a scroll's kinetic effect), the loop is slowed to
+    eco_fps. Any touch or key restores the full rate before it is handled
+    further, so pressing START never runs at the eco rate.
+
+    Wakeups are counted from Clock.frames, the loop iterations, per mode.
+
+    The frame cap is Clock._max_fps, which is private: install() checks it is
+    there and leaves eco mode off on a Kivy without it.
+    """
+
+    def __init__(self, eco_fps=10, linger=3.0):
+        self.full_fps = Clock._max_fps  # maxfps from the config; Clock reads it every frame
+        self.eco_fps = eco_fps
+        self.linger = linger
+        self.mode = FULL
+        self.last_input = time.monotonic()
+        self.frames = {FULL: 0, ECO: 0}
+        self.seconds = {FULL: 0.0, ECO: 0.0}
+        self._mark = (time.monotonic(), Clock.frames)
+        Window.bind(on_touch_down=self.wake, on_touch_move=self.wake, on_touch_up=self.wake, on_key_down=self.wake)
+        Clock.schedule_interval(self.check, 1.0)
+
+    def busy(self):
+        # Animation._instances is private too; a running Animation also shows up
+        # below as a 1/60 s Clock interval, so a Kivy without it is still covered
+        if getattr(Animation, "_instances", None):
+            return True
+        for event in Clock.get_events():
+            if event.loop and event.timeout <= TICK_INTERVAL:
+                return True
+        return False
+
+    def wake(self, *args):
+        self.last_input = time.monotonic()
+        if self.mode == ECO:
+            self._switch(FULL)
+
+    def check(self, dt):
+        idle = time.monotonic() - self.last_input >= self.linger and not self.busy()
+        if idle and self.mode == FULL:
+            self._switch(ECO)
+        elif not idle and self.mode == ECO:
+            self._switch(FULL)
+
+    def _account(self):
+        now, frames = time.monotonic(), Clock.frames
+        t0, f0 = self._mark
+        self.seconds[self.mode] += now - t0
+        self.frames[self.mode] += frames - f0
+        self._mark = (now, frames)
+
+    def _switch(self, mode):
+        self._account()
+        self.mode = mode
+        Clock._max_fps = self.full_fps if mode == FULL else self.eco_fps
+
+    def wakeups_per_minute(self):
+        self._account()
+        return {mode: 60 * self.frames[mode] / self.seconds[mode] if self.seconds[mode] else 0.0 for mode in (FULL, ECO)}
+
+    def report(self, *args):
+        rates = self.wakeups_per_minute()
+        print(f"[eco] wakeups/min  full {rates[FULL]:.0f} ({self.seconds[FULL]:.0f}s)"
+              f"  eco {rates[ECO]:.0f} ({self.seconds[ECO]:.0f}s)")
+
+
+def install():
+    """An EcoMode unless ECO_MODE=0; with ECO_REPORT set it reports every minute."""
+    if os.environ.get(ENV, "1") == "0":
+        return None
+    if not isinstance(getattr(Clock, "_max_fps", None), (int, float)):
+        print("Eco mode unavailable: this Kivy's Clock has no _max_fps frame cap")
+        return None
+    eco = EcoMode()
+    if os.environ.get(REPORT_ENV):
+        Clock.schedule_interval(eco.report, 60)
+    return eco
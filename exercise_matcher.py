@@ -0,0 +1,95 @@
+from collections import deque
+from functools import lru_cache
+
+
+class ExerciseMatcher:
+    """Finds exercise names in workout lines with one Aho-Corasick pass per line.
+
+    When several names occur in a line the longest one wins ("Side Plank" and
+    "Static Plank" over "Plank"), then the leftmost, so the answer never depends
+    on the order of the exercise dict. Matching is case-sensitive, like `in`.
+    """
+
+    def __init__(self, keys):
+        self.goto = [{}]
+        self.fail = [0]
+        self.key = [None]    # the key ending exactly at this node
+        self.best = [None]   # longest key ending here, following fail links
+        self.link = [0]      # nearest node down the fail chain that ends a key
+        for k in keys:
+            self._insert(k)
+        self._build()
+
+    def _insert(self, word):
+        node = 0
+        for ch in word:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.key.append(None)
+                self.best.append(None)
+                self.link.append(0)
+            node = nxt
+        self.key[node] = word
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        for node in queue:
+            self.best[node] = self.key[node]
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                f = self.goto[f].get(ch, 0)
+                self.fail[nxt] = f
+                self.link[nxt] = f if self.key[f] is not None else self.link[f]
+                # Depth only shrinks along fail links, so the node's own key
+                # (if any) is the longest, else whatever its fail node has
+                self.best[nxt] = self.key[nxt] if self.key[nxt] is not None else self.best[f]
+                queue.append(nxt)
+
+    def _step(self, node, ch):
+        while node and ch not in self.goto[node]:
+            node = self.fail[node]
+        return self.goto[node].get(ch, 0)
+
+    def find_all(self, line):
+        """Every (start, key) occurrence in line."""
+        found = []
+        node = 0
+        for i, ch in enumerate(line):
+            node = self._step(node, ch)
+            hit = node if self.key[node] is not None else self.link[node]
+            while hit:
+                k = self.key[hit]
+                found.append((i + 1 - len(k), k))
+                hit = self.link[hit]
+        return found
+
+    def match(self, line):
+        """The longest key found in line (leftmost on ties), or None."""
+        result = None
+        node = 0
+        for ch in line:
+            node = self._step(node, ch)
+            k = self.best[node]
+            if k is not None and (result is None or len(k) > len(result)):
+                result = k
+        return result
+
+
+def line_classifier(keys, parse_duration, maxsize=4096):
+    """Memoised line -> (exercise key or None, parse_duration(line))."""
+    matcher = ExerciseMatcher(keys)
+
+    @lru_cache(maxsize=maxsize)
+    def classify(line):
+        return matcher.match(line), parse_duration(line)
+
+    classify.matcher = matcher
+    return classify
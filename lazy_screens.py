@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+from kivy.core.window import Window
+
+from startup_profile import stage
+
+
+class LazyScreenMixin:
+    """ScreenManager mixin that builds registered screens on first use.
+
+    Screens registered as evictable are dropped again when more than
+    max_idle_screens of them are alive, or all at once on a memory warning.
+    A screen can implement get_state()/set_state(state) to be rehydrated when
+    it is rebuilt, and is_idle() to refuse eviction (e.g. a running timer).
+    """
+
+    max_idle_screens = 1
+
+    def __init__(self, **kwargs):
+        self.factories = {}
+        self.saved_state = {}
+        self.recent = OrderedDict()
+        super().__init__(**kwargs)
+        try:
+            Window.bind(on_memorywarning=self.on_memory_pressure)
+        except Exception:
+            pass  # older Kivy without the event: the LRU cap still applies
+
+    def register_screen(self, name, factory, evictable=False):
+        self.factories[name] = (factory, evictable)
+
+    def _built(self, name):
+        for screen in self.screens:
+            if screen.name == name:
+                return screen
+        return None
+
+    def get_screen(self, name):
+        screen = self._built(name)
+        if screen is None and name in self.factories:
+            factory, _ = self.factories[name]
+            with stage(f"screen {name}"):
+                screen = factory(name=name)
+            if name in self.saved_state:
+                screen.set_state(self.saved_state.pop(name))
+            self.add_widget(screen)
+            return screen
+        if screen is None:
+            return super().get_screen(name)
+        return screen
+
+    def has_screen(self, name):
+        return name in self.factories or super().has_screen(name)
+
+    def on_current(self, instance, value):
+        if value:
+            self.recent.pop(value, None)
+            self.recent[value] = True
+        super().on_current(instance, value)
+        self.trim()
+
+    def _evictable(self):
+        # Oldest first; never the visible screen or one still animating
+        busy = {self.current}
+        if self.transition.is_active:
+            busy.update(s.name for s in (self.transition.screen_in, self.transition.screen_out) if s)
+        names = [n for n in self.recent if n in self.factories and self.factories[n][1]]
+        names += [n for n, (_, evictable) in self.factories.items() if evictable and n not in names]
+        return [n for n in names if n not in busy and self._built(n) is not None]
+
+    def evict(self, name):
+        screen = self._built(name)
+        if screen is None or not getattr(screen, 'is_idle', lambda: True)():
+            return False
+        if hasattr(screen, 'get_state'):
+            self.saved_state[name] = screen.get_state()
+        self.remove_widget(screen)
+        return True
+
+    def trim(self):
+        alive = self._evictable()
+        for name in alive[:max(len(alive) - self.max_idle_screens, 0)]:
+            self.evict(name)
+
+    def on_memory_pressure(self, *args):
+        for name in self._evictable():
+            self.evict(name)
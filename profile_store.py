@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+
+
+def write_atomic(path, text):
+    """Temp file, fsync, rename: a crash leaves the old file or the new one, never half."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)  # make the rename itself durable
+        finally:
+            os.close(fd)
+    except OSError:
+        pass  # not supported on every platform (e.g. Windows)
+
+
+def load_profile(path, default):
+    """(profile, error message or None). A corrupt file is moved aside, not silently lost."""
+    if not os.path.exists(path):
+        return default, None
+    try:
+        with open(path, "r") as f:
+            return json.load(f), None
+    except (OSError, ValueError) as e:
+        try:
+            os.replace(path, path + ".corrupt")
+        except OSError:
+            pass
+        return default, f"Profile unreadable, using defaults ({e})"
+
+
+class ProfileWriter:
+    """Writes the profile JSON on a background thread.
+
+    save() only takes a snapshot. The worker waits until edits have been quiet
+    for `delay` seconds and writes once, so tapping through weeks costs one
+    write instead of one per tap. on_error(exc) is called from the worker.
+    """
+
+    def __init__(self, path, delay=0.5, on_error=None):
+        self.path = path
+        self.delay = delay
+        self.on_error = on_error
+        self.cond = threading.Condition()
+        self.pending = None
+        self.due = 0.0
+        self.writing = False
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="profile-writer", daemon=True)
+        self.thread.start()
+
+    def save(self, data):
+        snapshot = json.dumps(data)  # taken now, so later edits can't tear the write
+        with self.cond:
+            self.pending = snapshot
+            self.due = time.monotonic() + self.delay
+            self.cond.notify_all()
+
+    def flush(self, timeout=2.0):
+        """Write anything pending now and wait for it. False if it timed out."""
+        end = time.monotonic() + timeout
+        with self.cond:
+            self.due = 0.0
+            self.cond.notify_all()
+            while self.pending is not None or self.writing:
+                left = end - time.monotonic()
+                if left <= 0:
+                    return False
+                self.cond.wait(left)
+        return True
+
+    def close(self, timeout=2.0):
+        done = self.flush(timeout)
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join(timeout)
+        return done
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.closed and (self.pending is None or time.monotonic() < self.due):
+                    self.cond.wait(None if self.pending is None else self.due - time.monotonic())
+                if self.pending is None:
+                    return
+                snapshot, self.pending = self.pending, None
+                self.writing = True
+            try:
+                write_atomic(self.path, snapshot)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+            finally:
+                with self.cond:
+                    self.writing = False
+                    self.cond.notify_all()
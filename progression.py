@@ -0,0 +1,135 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CYCLE_WEEKS = 6
+SETS = 3
+
+# Smallest load step per lift when rounding to what can actually be loaded.
+# Lifts not listed fall back to the legacy behaviour of truncating to whole lbs.
+PLATE_INCREMENTS = {
+    "Hack Squat": 5, "Trap Bar Farmers Walk": 5, "Unilateral Leg Press": 5,
+    "Dumbbell Bench Press": 5,
+    "Cable Row": 2.5, "Tricep Pushdowns": 2.5, "Cable Woodchoppers": 2.5, "Leg Extension": 2.5,
+    "Seated Leg Curl": 2.5, "Cable Face Pulls": 2.5,
+}
+
+
+# A scheme maps (weeks, sets) to a weeks x sets grid of (fraction of 1RM, lbs added).
+
+def linear(start=0.80, step=2.5):
+    """The original rule: 80% of 1RM plus 2.5 lb per week, every set the same."""
+    def scheme(weeks, sets):
+        return [[(start, (w - 1) * step)] * sets for w in range(1, weeks + 1)]
+    return scheme
+
+
+def percentage_wave(waves=((0.65, 0.75, 0.85), (0.70, 0.80, 0.90), (0.75, 0.85, 0.95))):
+    """Ramping sets whose percentages climb week to week, repeating every len(waves) weeks."""
+    def scheme(weeks, sets):
+        return [[(waves[(w - 1) % len(waves)][min(s, len(waves[0]) - 1)], 0.0) for s in range(sets)]
+                for w in range(1, weeks + 1)]
+    return scheme
+
+
+def with_deload(base, week=CYCLE_WEEKS, fraction=0.60):
+    """base, except every set of the given week drops to a light fraction of 1RM."""
+    def scheme(weeks, sets):
+        grid = base(weeks, sets)
+        if week <= weeks:
+            grid[week - 1] = [(fraction, 0.0)] * sets
+        return grid
+    return scheme
+
+
+SCHEMES = {
+    "linear": linear(),
+    "wave": percentage_wave(),
+    "linear_deload": with_deload(linear()),
+    "wave_deload": with_deload(percentage_wave()),
+}
+
+
+class ProgressionTable:
+    """Load for every lift x week x set, computed in one pass from the 1RM maxes.
+
+    Lifts whose max isn't a number are left out, so load() returns None for them.
+    """
+
+    def __init__(self, maxes, scheme=SCHEMES["linear"], weeks=CYCLE_WEEKS, sets=SETS, increments=None):
+        self.scheme = scheme
+        self.weeks = weeks
+        self.sets = sets
+        one_rms = {}
+        for lift, value in maxes.items():
+            try:
+                one_rms[lift] = float(value)
+            except (TypeError, ValueError):
+                pass
+        self.one_rms = one_rms
+        self.increments = increments or {}
+        self.lifts = list(one_rms)
+        self.index = {lift: i for i, lift in enumerate(self.lifts)}
+        grid = scheme(weeks, sets)
+        rms = [one_rms[lift] for lift in self.lifts]
+        incs = [self.increments.get(lift, 0) for lift in self.lifts]
+        self.loads = self._compute(rms, grid, incs)
+
+    def _compute(self, rms, grid, incs):
+        if np is not None and rms:
+            pct = np.array([[p for p, _ in row] for row in grid])
+            add = np.array([[a for _, a in row] for row in grid])
+            raw = np.array(rms)[:, None, None] * pct[None] + add[None]
+            inc = np.array(incs, dtype=float)[:, None, None]
+            plated = np.round(raw / np.where(inc > 0, inc, 1)) * inc
+            loads = np.where(inc > 0, plated, np.trunc(raw))
+            # Whole-pound increments (and no rounding) keep int loads; 2.5 lb steps keep their half
+            return [rows.astype(int).tolist() if float(i).is_integer() else np.round(rows, 2).tolist()
+                    for rows, i in zip(loads, incs)]
+        return [[[round_load(rm * p + a, inc) for p, a in row] for row in grid] for rm, inc in zip(rms, incs)]
+
+    def load(self, lift, week, set_index=0):
+        i = self.index.get(lift)
+        if i is None:
+            return None
+        if 1 <= week <= self.weeks:
+            return self.loads[i][week - 1][min(set_index, self.sets - 1)]
+        # Outside the cycle (e.g. a week typed into the editor): work it out directly
+        week = max(week, 1)  # schemes start at week 1; earlier weeks get week 1's load
+        p, a = self.scheme(week, self.sets)[week - 1][min(set_index, self.sets - 1)]
+        return round_load(self.one_rms[lift] * p + a, self.increments.get(lift, 0))
+
+    def week_row(self, lift, set_index=0):
+        """Loads for one lift across the whole cycle, e.g. for a plan preview."""
+        i = self.index.get(lift)
+        if i is None:
+            return []
+        return [week[min(set_index, self.sets - 1)] for week in self.loads[i]]
+
+
+def round_load(value, increment):
+    if increment > 0:
+        value = round(value / increment) * increment
+        return int(value) if float(increment).is_integer() else round(value, 2)
+    return int(value)
+
+
+_tables = {}
+
+
+def progression_for(profile):
+    """Shared table for the profile's maxes, rebuilt only when a max or setting changes.
+
+    The profile may pick a scheme ("progression": one of SCHEMES) and opt into
+    rounding to loadable plates ("plate_rounding": true).
+    """
+    scheme_name = profile.get("progression", "linear")
+    plates = bool(profile.get("plate_rounding", False))
+    key = (scheme_name, plates, tuple(sorted(profile["maxes"].items())))
+    table = _tables.get(key)
+    if table is None:
+        _tables.clear()
+        table = _tables[key] = ProgressionTable(profile["maxes"], SCHEMES.get(scheme_name, SCHEMES["linear"]),
+                                                increments=PLATE_INCREMENTS if plates else None)
+    return table
@@ -0,0 +1,118 @@
+"""Run routines at virtual time, without Kivy.
+
+Drives the same DeadlineTimer/RoutineTimeline logic the screens use and
+records every phase change, sound cue and countdown label text. Time jumps
+straight to the next label change (or the next deadline when labels are off),
+so a 20 minute routine takes milliseconds.
+
+    python routine_sim.py rehab
+"""
+import sys
+import time
+from collections import namedtuple
+
+from deadline_timer import DeadlineTimer, VirtualClock, format_mmss
+from routine_timeline import RoutineTimeline
+import routines
+
+SimEvent = namedtuple("SimEvent", "t kind value")  # kind: phase / cue / label
+
+# Which sound each screen plays when a step of that type starts (default beep)
+AIRBIKE_CUES = {}
+LADDER_CUES = {"DONE": "buzzer"}  # Air_Bike_Timer.py
+LOOP_CUES = {"REST": "buzzer"}
+SIDE_PLANK_CUES = {"BREAK": "buzzer"}
+
+PRESETS = {
+    "air_bike_timer": (routines.ROUTINES["air_bike_timer"], LADDER_CUES, "beep"),
+    "workout_timer": (routines.ROUTINES["workout_timer"], AIRBIKE_CUES, "beep"),
+    "air_bike_and_loop": (routines.ROUTINES["air_bike_and_loop"], AIRBIKE_CUES, "beep"),
+    "rehab": (routines.ROUTINES["rehab"], AIRBIKE_CUES, None),
+    "bjj_rehab": (routines.ROUTINES["bjj_rehab"], AIRBIKE_CUES, None),
+    "loop": (routines.work_rest_loop, LOOP_CUES, None),
+    "countdown": (routines.countdown, AIRBIKE_CUES, None),
+    "side_plank": (routines.side_plank, SIDE_PLANK_CUES, None),
+}
+
+
+def simulate(steps, cues=AIRBIKE_CUES, start_cue=None, labels=True, tick=None):
+    """Play a routine from start to finish and return its SimEvents.
+
+    tick=None jumps between interesting instants. Pass the screens' poll
+    interval to see events at the time a real Clock loop would notice them.
+    """
+    timeline = steps if isinstance(steps, RoutineTimeline) else RoutineTimeline(steps)
+    if not len(timeline):
+        return []
+    clock = VirtualClock()
+    timer = DeadlineTimer(clock)
+    events = []
+    last_text = None
+
+    idx = 0
+    step_type, duration, label = timeline[0]
+    timer.set(duration)
+    timer.start()
+    if start_cue:
+        events.append(SimEvent(0.0, "cue", start_cue))
+    events.append(SimEvent(0.0, "phase", (0, step_type, label)))
+
+    last = len(timeline) - 1
+    while True:
+        # Same catch-up loop as the screens' update_timer
+        while timer.expired and idx < last:
+            idx += 1
+            step_type, duration, label = timeline[idx]
+            timer.advance(duration)
+            events.append(SimEvent(clock.t, "cue", cues.get(step_type, "beep")))
+            events.append(SimEvent(clock.t, "phase", (idx, step_type, label)))
+
+        left = timer.seconds_left()
+        if labels:
+            text = format_mmss(left)
+            if text != last_text:
+                events.append(SimEvent(clock.t, "label", text))
+                last_text = text
+
+        if idx == last and timer.expired:
+            return events
+
+        if tick:
+            clock.advance(tick)
+        elif labels and left > 1:
+            clock.t = timer.deadline - (left - 1)
+        else:
+            clock.t = timer.deadline
+
+
+def simulate_preset(name, *args, labels=True, tick=None):
+    build, cues, start_cue = PRESETS[name]
+    return simulate(build(*args), cues, start_cue, labels=labels, tick=tick)
+
+
+def simulate_batch(variants, cues=AIRBIKE_CUES, start_cue=None, labels=False):
+    """Simulate many step lists; returns one event list per variant."""
+    return [simulate(v, cues, start_cue, labels=labels) for v in variants]
+
+
+def print_events(events):
+    for e in events:
+        m, s = divmod(e.t, 60)
+        if e.kind == "phase":
+            i, step_type, label = e.value
+            value = f"#{i} {step_type} {label}"
+        else:
+            value = e.value
+        print(f"{int(m):02d}:{s:06.3f}  {e.kind:<5}  {value}")
+
+
+if __name__ == "__main__":
+    name = sys.argv[1] if len(sys.argv) > 1 else "rehab"
+    if name not in PRESETS:
+        print(f"Unknown routine '{name}'. Choose from: {', '.join(PRESETS)}")
+        sys.exit(1)
+    t0 = time.perf_counter()
+    events = simulate_preset(name)
+    took = time.perf_counter() - t0
+    print_events(events)
+    print(f"{len(events)} events, {events[-1].t:.0f}s of workout simulated in {took * 1000:.2f} ms")
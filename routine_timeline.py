@@ -0,0 +1,60 @@
+from bisect import bisect_right
+
+
+class RoutineTimeline:
+    """A routine compiled once into steps plus cumulative start offsets.
+
+    Still behaves like the plain list of (type, duration, label) tuples the
+    screens index into, but can also seek to an elapsed time, jump to a named
+    phase and report total/remaining workout time without walking the steps.
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.starts = []
+        t = 0
+        for _, duration, _ in self.steps:
+            self.starts.append(t)
+            t += duration
+        self.total = t
+
+        # Every leading run of words in a label ("PHASE", "PHASE 3", ...) points
+        # at the first step that uses it, so jumps are a dict lookup
+        self.sections = {}
+        for i, (_, _, label) in enumerate(self.steps):
+            words = [w.strip(":|") for w in label.upper().split()]
+            words = [w for w in words if w]
+            for n in range(1, len(words) + 1):
+                self.sections.setdefault(" ".join(words[:n]), i)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __getitem__(self, index):
+        return self.steps[index]
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def start_of(self, index):
+        return self.starts[index]
+
+    def locate(self, elapsed):
+        """Return (step index, seconds into that step) for an elapsed time."""
+        if not self.steps:
+            raise IndexError("empty routine")
+        elapsed = min(max(elapsed, 0), self.total)
+        i = max(bisect_right(self.starts, elapsed) - 1, 0)
+        return i, elapsed - self.starts[i]
+
+    def find(self, section):
+        """Index of the first step whose label starts with section, or None."""
+        return self.sections.get(" ".join(section.upper().split()))
+
+    def elapsed(self, index, time_left):
+        """Workout time done when step index has time_left seconds to go."""
+        return self.starts[index] + self.steps[index][1] - time_left
+
+    def remaining(self, index, time_left):
+        """Workout time still to go, including the rest of the current step."""
+        return self.total - self.elapsed(index, time_left)
@@ -0,0 +1,119 @@
+# Routines shared by the timer screens and the headless simulator.
+# Format: (Type, Duration, Label_Text). Kept free of Kivy imports on purpose.
+#
+# Fixed protocols live in routine_defs/<name>.json. A file is a list of steps,
+# each either a leaf {"type", "seconds", "label"} or a block {"steps": [...]}
+# with an optional "repeat" count, "phase" name and default "label" for its
+# children. Labels may use {i} and {n}, the innermost repeat's counter and count.
+import hashlib
+import json
+import marshal
+import os
+
+ROUTINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routine_defs")
+CACHE_DIR = os.path.join(ROUTINE_DIR, "__cache__")
+COMPILER_VERSION = 1
+
+_loaded = {}
+
+
+def compile_routine(doc, name="routine"):
+    """Flatten a parsed routine file into a list of (type, seconds, label) steps."""
+    steps = []
+    _expand(doc["steps"], None, {}, steps, name)
+    return steps
+
+
+def _expand(items, label, counters, out, where):
+    for n, item in enumerate(items):
+        here = f"{where}[{n}]"
+        item_label = item.get("label", label)
+        if "steps" in item:
+            count = int(item.get("repeat", 1))
+            for i in range(1, count + 1):
+                inner = dict(counters, i=i, n=count) if "repeat" in item else counters
+                _expand(item["steps"], item_label, inner, out, here)
+            continue
+        if "type" not in item or "seconds" not in item or item_label is None:
+            raise ValueError(f"{here}: a step needs type, seconds and label")
+        try:
+            text = item_label.format(**counters) if "{" in item_label else item_label
+        except (KeyError, IndexError) as e:
+            raise ValueError(f"{here}: label {item_label!r} uses {e} outside a repeat") from None
+        out.append((item["type"], int(item["seconds"]), text))
+
+
+def load_routine(name, routine_dir=None, cache_dir=None):
+    """Steps for routine_defs/<name>.json, compiled once per distinct file content.
+
+    The compiled steps are cached with marshal under a hash of the file bytes, so
+    an unchanged routine is never parsed again, and editing the file (no code
+    change) takes effect on the next start.
+    """
+    path = os.path.join(routine_dir or ROUTINE_DIR, name + ".json")
+    with open(path, "rb") as f:
+        raw = f.read()
+    key = hashlib.sha1(raw + b"\0%d" % COMPILER_VERSION).hexdigest()[:16]
+    if key in _loaded:
+        return list(_loaded[key])
+
+    cache_dir = cache_dir or CACHE_DIR
+    cached = os.path.join(cache_dir, f"{name}-{key}.bin")
+    try:
+        with open(cached, "rb") as f:
+            steps = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        steps = compile_routine(json.loads(raw.decode("utf-8")), name)
+        _write_cache(cache_dir, name, cached, steps)
+    _loaded[key] = steps
+    return list(steps)
+
+
+def _write_cache(cache_dir, name, cached, steps):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for old in os.listdir(cache_dir):
+            if old.startswith(name + "-") and old.endswith(".bin"):
+                os.remove(os.path.join(cache_dir, old))
+        tmp = cached + ".tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump(steps, f)
+        os.replace(tmp, cached)
+    except OSError:
+        pass  # read-only install: compile on every start instead
+
+
+def available():
+    """Names of the routine files that can be passed to load_routine()."""
+    return sorted(n[:-5] for n in os.listdir(ROUTINE_DIR) if n.endswith(".json"))
+
+
+def work_rest_loop(work=30, rest=2, sets=10):
+    """Loop30Screen as a finite routine. Zero-length phases still last one second."""
+    r = []
+    for i in range(1, sets + 1):
+        r.append(("WORK", max(work, 1), f"SET: {i}"))
+        r.append(("REST", max(rest, 1), f"SET: {i}"))
+    return r
+
+
+def countdown(seconds=60):
+    """SIMPLE mode of SimpleTimerScreen: one countdown, a beep at zero."""
+    return [("TIMER", seconds, "TIMER"), ("DONE", 0, "DONE")]
+
+
+def side_plank(hold=60, rest=10):
+    """SIDEPLANK mode of SimpleTimerScreen: left side, break, right side."""
+    return [("SIDE", hold, "SIDE 1 (L)"), ("BREAK", rest, "BREAK"), ("SIDE", hold, "SIDE 2 (R)"), ("DONE", 0, "DONE")]
+
+
+ROUTINES = {
+    "air_bike_timer": lambda: load_routine("air_bike_timer"),
+    "workout_timer": lambda: load_routine("workout_timer"),
+    "air_bike_and_loop": lambda: load_routine("air_bike_and_loop"),
+    "rehab": lambda: load_routine("rehab"),
+    "bjj_rehab": lambda: load_routine("bjj_rehab"),
+    "loop": work_rest_loop,
+    "countdown": countdown,
+    "side_plank": side_plank,
+}
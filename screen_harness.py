@@ -0,0 +1,362 @@
+"""Drive the real timer screens on a virtual clock.
+
+The app module's Clock and audio_manager are swapped for a FakeClock and a
+SoundSink, and the screen's DeadlineTimer reads a VirtualClock, so a 20 minute
+routine plays out in well under a second. Every cue and label change is
+recorded with its virtual time and compared with routine_sim, which computes
+when each of them should happen. Frame profiles inject late, jittery or
+clumped ticks to show how each screen degrades when frames stall.
+
+    python screen_harness.py                          # every scenario, every profile
+    python screen_harness.py rehab.airbike --profile stalls --events
+
+From code:
+
+    with ScreenHarness.for_scenario("bjj.loop30") as h:
+        h.start()
+        h.run(120, stalls())
+        assert [e.value for e in h.cues()][:2] == ["buzzer", "beep"]
+"""
+import argparse
+import random
+import sys
+from collections import namedtuple
+
+from deadline_timer import CUE_LATE_LIMIT, TICK_INTERVAL, VirtualClock
+from routine_sim import AIRBIKE_CUES, LOOP_CUES, SIDE_PLANK_CUES, simulate
+import routines
+
+HarnessEvent = namedtuple("HarnessEvent", "t kind value")  # kind: cue / label, like SimEvent
+
+
+class FakeEvent:
+    def __init__(self, clock, callback, timeout, interval):
+        self.clock = clock
+        self.callback = callback
+        self.timeout = timeout
+        self.interval = interval
+        self.last = clock.vclock.t
+        self.due = self.last + max(timeout, 0)
+
+    def cancel(self):
+        if self in self.clock.events:
+            self.clock.events.remove(self)
+
+    def __call__(self, *args):
+        # A create_trigger() handle: schedule once unless already pending
+        if self not in self.clock.events:
+            self.last = self.clock.vclock.t
+            self.due = self.last + max(self.timeout, 0)
+            self.clock.events.append(self)
+
+
+class FakeClock:
+    """The part of kivy.clock.Clock the screens use, run on a VirtualClock.
+
+    Like Kivy, an interval event fires at most once per frame, with dt measured
+    from when it last ran, and is next due timeout after it actually ran.
+    """
+
+    def __init__(self, vclock):
+        self.vclock = vclock
+        self.events = []
+
+    def schedule_interval(self, callback, timeout):
+        return self._add(FakeEvent(self, callback, timeout, True))
+
+    def schedule_once(self, callback, timeout=0):
+        return self._add(FakeEvent(self, callback, timeout, False))
+
+    def create_trigger(self, callback, timeout=0):
+        return FakeEvent(self, callback, timeout, False)
+
+    def get_events(self):
+        return list(self.events)
+
+    def _add(self, event):
+        self.events.append(event)
+        return event
+
+    def frame(self, dt, repeat=1):
+        """Advance by dt, then run everything due. repeat > 1 re-runs due interval
+        events back to back, as when a stalled loop works off a backlog."""
+        self.vclock.advance(dt)
+        now = self.vclock.t
+        for event in sorted((e for e in self.events if e.due <= now), key=lambda e: e.due):
+            if event not in self.events:
+                continue  # cancelled by an earlier callback this frame
+            for i in range(repeat if event.interval else 1):
+                elapsed, event.last = now - event.last, now
+                if not event.interval:
+                    event.cancel()
+                if event.callback(elapsed) is False and event.interval:
+                    event.cancel()
+                if event not in self.events:
+                    break
+            event.due = now + event.timeout
+
+
+class SoundSink:
+    """Stands in for the app's CuePlayer: records cues instead of playing them."""
+
+    def __init__(self, clock, events):
+        self.clock = clock
+        self.events = events
+        self.pending = {}
+        self.late = []  # how long after it was due each cue started
+
+    def play(self, name, due=None):
+        t = self.clock.vclock.t
+        self.events.append(HarnessEvent(t, "cue", name))
+        self.late.append(t - due if due is not None else 0.0)
+
+    def schedule(self, name, at, key=None):
+        if at < self.clock.vclock.t - CUE_LATE_LIMIT:
+            return None
+        events = self.pending.setdefault(key, [])
+
+        def fire(dt):
+            if event in events:
+                events.remove(event)
+            self.play(name, due=at)
+
+        event = self.clock.schedule_once(fire, max(at - self.clock.vclock.t, 0))
+        events.append(event)
+        return event
+
+    def countdown(self, name, at, count=3, key=None):
+        for i in range(count, 0, -1):
+            if at - i > self.clock.vclock.t:
+                self.schedule(name, at - i, key)
+
+    def cancel(self, key=None):
+        for event in self.pending.pop(key, []):
+            event.cancel()
+
+    def load(self, name, path):
+        return True
+
+    def latency_stats(self):
+        return {"count": len(self.late), "mean_ms": 1000 * sum(self.late) / max(len(self.late), 1),
+                "max_ms": 1000 * max(self.late, default=0.0)}
+
+
+# Frame profiles: iterables of frame lengths, or (length, repeat) for a clumped frame
+
+def steady(fps=60):
+    while True:
+        yield 1.0 / fps
+
+
+def jittered(fps=60, late=0.08, seed=0):
+    rng = random.Random(seed)
+    while True:
+        yield 1.0 / fps + rng.uniform(0, late)
+
+
+def stalls(fps=60, every=7.0, stall=0.9):
+    """Smooth frames with a stall of `stall` seconds every `every` seconds."""
+    t = 0.0
+    while True:
+        if t >= every:
+            t = 0.0
+            yield stall
+        else:
+            t += 1.0 / fps
+            yield 1.0 / fps
+
+
+def clumped(fps=60, every=3.0, stall=0.5, count=4):
+    """After each stall, the timer callback runs count times in the same frame."""
+    for dt in stalls(fps, every, stall):
+        yield (dt, count) if dt == stall else dt
+
+
+PROFILES = {"steady": steady, "jitter": jittered, "stalls": stalls, "clumped": clumped}
+
+
+# Scenario: app, screen class, how to start it, and the routine_sim model of
+# what it should do: (steps, cues, start_cue) computed from the built screen
+SCENARIOS = {
+    "rehab.airbike": ("rehab", "AirBikeScreen", lambda s: s.toggle_timer(None),
+                      lambda s: (routines.load_routine("rehab"), AIRBIKE_CUES, None)),
+    "rehab.loop30": ("rehab", "Loop30Screen", lambda s: s.toggle(None),
+                     lambda s: (routines.work_rest_loop(int(s.in_work.text), int(s.in_rest.text), 200), LOOP_CUES, None)),
+    "rehab.simple": ("rehab", "SimpleTimerScreen", lambda s: (s.set_time(90), s.toggle(None)),
+                     lambda s: (routines.countdown(90), AIRBIKE_CUES, None)),
+    "bjj.airbike": ("bjj", "AirBikeScreen", lambda s: s.toggle(),
+                    lambda s: (routines.load_routine("bjj_rehab"), AIRBIKE_CUES, None)),
+    "bjj.loop30": ("bjj", "Loop30Screen", lambda s: s.toggle(),
+                   lambda s: (routines.work_rest_loop(int(s.in_work.text), int(s.in_rest.text), 200), LOOP_CUES, None)),
+    "bjj.sideplank": ("bjj", "SimpleTimerScreen", lambda s: (s.set_time(60, "SIDEPLANK"), s.toggle()),
+                      lambda s: (routines.side_plank(60, 10), SIDE_PLANK_CUES, None)),
+    "air_bike_and_loop.airbike": ("air_bike_and_loop", "AirBikeScreen", lambda s: s.toggle_timer(None),
+                                  lambda s: (routines.load_routine("air_bike_and_loop"), AIRBIKE_CUES, "beep")),
+    "air_bike_and_loop.loop30": ("air_bike_and_loop", "Loop30Screen", lambda s: s.toggle_timer(None),
+                                 lambda s: (routines.work_rest_loop(*s.get_user_settings(), 200), LOOP_CUES, "beep")),
+}
+LOOP_SECONDS = 300  # loops never end on their own; how long to run them
+
+
+class ScreenHarness:
+    """One screen of an app module, running on virtual time.
+
+    Use as a context manager (or call close()) so the module globals that
+    were swapped out are put back.
+    """
+
+    SWAPPED = ("Clock", "audio_manager", "event_log", "session_checkpoint", "timing")
+
+    def __init__(self, app, screen_cls, **kwargs):
+        self.app = app
+        self.vclock = VirtualClock()
+        self.clock = FakeClock(self.vclock)
+        self.events = []
+        self.sound = SoundSink(self.clock, self.events)
+        self.saved = {name: getattr(app, name) for name in self.SWAPPED if hasattr(app, name)}
+        for name in self.saved:
+            setattr(app, name, None)
+        app.Clock = self.clock
+        app.audio_manager = self.sound
+        self.screen = screen_cls(name=kwargs.pop("name", "harness"), **kwargs)
+        self.screen.timer.clock = self.vclock
+        self.labels = {name: w for name, w in vars(self.screen).items() if name.startswith("lbl_") and hasattr(w, "text")}
+        self.shown = {name: w.text for name, w in self.labels.items()}
+        self.started_at = 0.0
+        self.scenario = None
+
+    @classmethod
+    def for_scenario(cls, name):
+        app_key, screen_name, _, _ = SCENARIOS[name]
+        app = _app(app_key)
+        harness = cls(app, getattr(app, screen_name))
+        harness.scenario = name
+        return harness
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for event in list(self.clock.events):
+            event.cancel()
+        for name, value in self.saved.items():
+            setattr(self.app, name, value)
+
+    def start(self):
+        """Press start the way the scenario's screen is started."""
+        self.started_at = self.vclock.t
+        SCENARIOS[self.scenario][2](self.screen)
+        self._poll(force=True)
+
+    def expected(self, labels=True):
+        """routine_sim's account of the run, shifted to when start() was pressed."""
+        steps, cues, start_cue = SCENARIOS[self.scenario][3](self.screen)
+        return [e._replace(t=e.t + self.started_at) for e in simulate(steps, cues, start_cue, labels=labels)]
+
+    def run(self, seconds, frames=None):
+        end = self.vclock.t + seconds
+        for step in (frames if frames is not None else steady()):
+            if self.vclock.t >= end:
+                break
+            dt, repeat = step if isinstance(step, tuple) else (step, 1)
+            self.clock.frame(dt, repeat)
+            self._poll()
+        return self.events
+
+    def _poll(self, force=False):
+        for name, widget in self.labels.items():
+            if force or widget.text != self.shown[name]:
+                self.shown[name] = widget.text
+                self.events.append(HarnessEvent(self.vclock.t, "label", (name, widget.text)))
+
+    def cues(self):
+        return [e for e in self.events if e.kind == "cue"]
+
+    def timer_labels(self):
+        return [HarnessEvent(e.t, "label", e.value[1]) for e in self.events
+                if e.kind == "label" and e.value[0] == "lbl_timer"]
+
+
+_apps = {}
+
+
+def _app(key):
+    from benchmarks import headless_env, load_app
+    if key not in _apps:
+        headless_env()
+        _apps[key] = load_app(key)
+    return _apps[key]
+
+
+def lateness(got, want):
+    """Pair each expected event with the next recorded one of the same value;
+    returns (delays in seconds, number of expected events never seen)."""
+    delays, missing, i = [], 0, 0
+    for w in want:
+        j = i
+        while j < len(got) and (got[j].value != w.value or got[j].t < w.t - 1e-6):
+            j += 1
+        if j == len(got):
+            missing += 1
+            continue
+        delays.append(got[j].t - w.t)
+        i = j + 1
+    return delays, missing
+
+
+def report(harness, until):
+    want = [e for e in harness.expected() if e.t <= until]
+    cue_delays, cues_missing = lateness(harness.cues(), [e for e in want if e.kind == "cue"])
+    label_delays, labels_missing = lateness(harness.timer_labels(), [e for e in want if e.kind == "label"])
+    return {
+        "cues": len(harness.cues()), "cues_expected": sum(e.kind == "cue" for e in want), "cues_missing": cues_missing,
+        "cue_late_max_ms": 1000 * max(cue_delays, default=0.0),
+        "cue_late_mean_ms": 1000 * sum(cue_delays) / max(len(cue_delays), 1),
+        "labels_missing": labels_missing,
+        "label_late_max_ms": 1000 * max(label_delays, default=0.0),
+        "label_late_mean_ms": 1000 * sum(label_delays) / max(len(label_delays), 1),
+    }
+
+
+def run_scenario(name, profile="steady", seconds=None, show_events=False):
+    with ScreenHarness.for_scenario(name) as h:
+        h.start()
+        expected = h.expected(labels=False)
+        if seconds is None:
+            looping = name.endswith("loop30")
+            seconds = LOOP_SECONDS if looping or not expected else expected[-1].t - h.started_at + 1
+        h.run(seconds, PROFILES[profile]())
+        if show_events:
+            for e in h.events:
+                print(f"{e.t:9.3f}  {e.kind:<5}  {e.value}")
+        return report(h, h.vclock.t)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Run timer screens on a virtual clock.")
+    parser.add_argument("scenarios", nargs="*", help=f"default: all of {', '.join(SCENARIOS)}")
+    parser.add_argument("--profile", choices=sorted(PROFILES), action="append", help="frame profile (repeatable)")
+    parser.add_argument("--seconds", type=float, help="virtual seconds to run (default: the whole routine)")
+    parser.add_argument("--events", action="store_true", help="print every recorded event")
+    args = parser.parse_args(argv)
+    failed = False
+    for name in args.scenarios or SCENARIOS:
+        for profile in args.profile or list(PROFILES):
+            try:
+                r = run_scenario(name, profile, args.seconds, args.events)
+            except Exception as e:
+                print(f"{name:<28} {profile:<8} failed: {e!r}")
+                failed = True
+                continue
+            failed |= bool(r["cues_missing"])
+            print(f"{name:<28} {profile:<8} cues {r['cues']}/{r['cues_expected']} (missing {r['cues_missing']})"
+                  f"  cue late max {r['cue_late_max_ms']:.0f} mean {r['cue_late_mean_ms']:.0f} ms"
+                  f"  label late max {r['label_late_max_ms']:.0f} mean {r['label_late_mean_ms']:.0f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,84 @@
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+# One fixed-size record, rewritten in place through an mmap. A store into the
+# mapping lands in the page cache straight away, so it survives the process
+# being killed without a write()/fsync per phase change.
+MAGIC = b"ABCK"
+VERSION = 1
+RECORD = struct.Struct("<4sHHIidddI")  # magic, version, flags, routine id, step, remaining, mono, wall, seq
+CRC = struct.Struct("<I")
+FILE_SIZE = 64
+
+FLAG_RUNNING = 1
+
+Checkpoint = namedtuple("Checkpoint", "routine_id step_index remaining running mono wall seq")
+
+
+def routine_id(steps):
+    """Stable id for a routine, so a checkpoint is never applied to a different one."""
+    return zlib.crc32(repr([tuple(s) for s in steps]).encode("utf-8")) & 0xFFFFFFFF
+
+
+class SessionCheckpoint:
+    def __init__(self, path):
+        self.path = path
+        self.seq = 0
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size < FILE_SIZE:
+                os.ftruncate(fd, FILE_SIZE)
+            self.map = mmap.mmap(fd, FILE_SIZE)
+        finally:
+            os.close(fd)
+
+    def save(self, routine, step_index, remaining, running):
+        self.seq += 1
+        payload = RECORD.pack(MAGIC, VERSION, FLAG_RUNNING if running else 0, routine, step_index,
+                              remaining, time.monotonic(), time.time(), self.seq)
+        self.map[:RECORD.size] = payload
+        self.map[RECORD.size:RECORD.size + CRC.size] = CRC.pack(zlib.crc32(payload))
+
+    def load(self):
+        payload = self.map[:RECORD.size]
+        crc, = CRC.unpack(self.map[RECORD.size:RECORD.size + CRC.size])
+        magic, version, flags, rid, step, remaining, mono, wall, seq = RECORD.unpack(payload)
+        if magic != MAGIC or version != VERSION or crc != zlib.crc32(payload):
+            return None
+        self.seq = seq
+        return Checkpoint(rid, step, remaining, bool(flags & FLAG_RUNNING), mono, wall, seq)
+
+    def clear(self):
+        self.map[:4] = b"\0\0\0\0"
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+
+
+def elapsed_since(cp):
+    """Seconds since the checkpoint was written.
+
+    The monotonic clock is trusted while it agrees with wall time; after a
+    reboot it restarts near zero, so we fall back to the wall-clock anchor.
+    """
+    mono = time.monotonic() - cp.mono
+    wall = time.time() - cp.wall
+    if mono >= 0 and abs(mono - wall) < 2.0:
+        return mono
+    return max(wall, 0.0)
+
+
+def resume_point(cp, timeline):
+    """Step index and time left to continue from, as if the timer never stopped."""
+    left = cp.remaining
+    if cp.running:
+        left -= elapsed_since(cp)
+    if left > 0 or cp.step_index >= len(timeline) - 1:
+        return cp.step_index, max(left, 0.0)
+    idx, into = timeline.locate(timeline.elapsed(cp.step_index, left))
+    return idx, timeline[idx][1] - into
@@ -0,0 +1,154 @@
+import gc
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+# Fixed-width records: wall time, routine id, step index, label id, event kind
+RECORD = struct.Struct("<dIHHB7x")
+SEGMENT_RECORDS = 65536  # ~1.5 MB per segment file
+NO_LABEL = 0xFFFF
+
+START, RESUME, PAUSE, STEP_DONE, SKIP, BACK, FINISH, EXIT = range(8)
+KIND_NAMES = ["START", "RESUME", "PAUSE", "STEP_DONE", "SKIP", "BACK", "FINISH", "EXIT"]
+
+# Field order matches RECORD, so rows unpack straight into events
+Event = namedtuple("Event", "t routine_id step label_id kind")
+
+
+def wall_time(monotonic_t):
+    """Wall-clock time of a time.monotonic() instant, e.g. a step's deadline."""
+    return time.time() - (time.monotonic() - monotonic_t)
+
+
+class SessionLog:
+    """Append-only log of session events in a directory of segment files.
+
+    Labels are interned once into a string table, so a record stays 24 bytes.
+    Appending is one buffered write; reading maps each segment and unpacks it in C.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.strings_path = os.path.join(directory, "strings.txt")
+        self.strings = self._read_strings()
+        self.string_ids = {s: i for i, s in enumerate(self.strings)}
+        self.segment = None
+        self.file = None
+        self.count = 0
+        segments = self.segments()
+        if segments:
+            self._open(segments[-1])
+        else:
+            self._open(self._segment_path(1))
+
+    def _read_strings(self):
+        try:
+            with open(self.strings_path, "r", encoding="utf-8") as f:
+                data = f.read()
+        except OSError:
+            return []
+        if data and not data.endswith("\n"):
+            # A label torn by a crash: rewrite the complete ones, so the next
+            # intern() doesn't append onto the partial line
+            data = data[:data.rfind("\n") + 1]
+            tmp = self.strings_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.strings_path)
+        return data.split("\n")[:-1]
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f"events-{number:06d}.log")
+
+    def segments(self):
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("events-") and n.endswith(".log"))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def _open(self, path):
+        if self.file:
+            self.file.close()
+        self.segment = path
+        self.file = open(path, "ab")
+        size = self.file.tell()
+        if size % RECORD.size:
+            # A record torn by a crash: drop it so the next one stays aligned
+            size -= size % RECORD.size
+            self.file.truncate(size)
+        self.count = size // RECORD.size
+
+    def _rotate(self):
+        number = int(os.path.basename(self.segment)[7:13]) + 1
+        self._open(self._segment_path(number))
+
+    def intern(self, label):
+        if label is None:
+            return NO_LABEL
+        label = label.replace("\n", " ")
+        sid = self.string_ids.get(label)
+        if sid is None:
+            if len(self.strings) >= NO_LABEL:
+                return NO_LABEL
+            sid = self.string_ids[label] = len(self.strings)
+            self.strings.append(label)
+            with open(self.strings_path, "a", encoding="utf-8") as f:
+                f.write(label + "\n")
+        return sid
+
+    def append(self, kind, routine_id, step, label=None, t=None):
+        if self.count >= SEGMENT_RECORDS:
+            self._rotate()
+        self.file.write(RECORD.pack(time.time() if t is None else t, routine_id, step, self.intern(label), kind))
+        self.file.flush()
+        self.count += 1
+
+    def events(self, since=None):
+        """Every event in order, optionally only those at or after wall time since."""
+        self.file.flush()
+        out = []
+        # Hundreds of thousands of small tuples would otherwise trigger repeated
+        # collector passes over objects that can't form cycles
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._read(since, out)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _read(self, since, out):
+        for path in self.segments():
+            size = os.path.getsize(path)
+            size -= size % RECORD.size
+            if not size:
+                continue
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as m:
+                records = RECORD.iter_unpack(m)
+                if since is not None:
+                    records = (r for r in records if r[0] >= since)
+                out.extend(records)
+        return list(map(Event._make, out))
+
+    def label(self, event):
+        return self.strings[event.label_id] if event.label_id != NO_LABEL else None
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def print_events(log, events):
+    for e in events:
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e.t))
+        print(f"{stamp}  {KIND_NAMES[e.kind]:<9} {e.routine_id:08x} step {e.step:>3}  {log.label(e) or ''}")
+
+
+if __name__ == "__main__":
+    import sys
+    log = SessionLog(sys.argv[1] if len(sys.argv) > 1 else "session_log")
+    print_events(log, log.events())
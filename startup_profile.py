@@ -0,0 +1,122 @@
+"""Opt-in cold start profiler for the app entry points.
+
+Enable with STARTUP_PROFILE=1 (or a report path) or --profile-startup, and
+optionally set a budget with STARTUP_BUDGET_MS=900 or --startup-budget=900.
+The entry script imports this module before Kivy. Every import statement in
+the script, SoundManager(), load_data(), each screen constructor and the first
+frame are then timed. After the first frame the app writes a JSON report and
+stops; the entry script's finish() call after App.run() exits with status 1
+if the budget was exceeded.
+"""
+import builtins
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+_t0 = time.perf_counter()
+_real_import = builtins.__import__
+
+
+def _take_flag(prefix):
+    for arg in list(sys.argv[1:]):
+        if arg == prefix or arg.startswith(prefix + "="):
+            # Strip it before Kivy parses argv and rejects unknown options
+            sys.argv.remove(arg)
+            return arg.partition("=")[2] or "1"
+    return None
+
+
+_flag = _take_flag("--profile-startup")
+_budget = _take_flag("--startup-budget") or os.environ.get("STARTUP_BUDGET_MS")
+REPORT = _flag or os.environ.get("STARTUP_PROFILE")
+ENABLED = bool(REPORT)
+BUDGET_MS = None
+if _budget:
+    try:
+        BUDGET_MS = float(_budget)
+    except ValueError:
+        print(f"Startup budget ignored, not a number of ms: {_budget!r}")
+exit_code = 0
+
+stages = []
+_depth = 0
+
+
+def _ms(t):
+    return round((t - _t0) * 1000, 3)
+
+
+@contextmanager
+def stage(name):
+    """Time a block as one stage. Costs nothing when profiling is off."""
+    global _depth
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        stages.append({"stage": name, "start_ms": _ms(start),
+                       "ms": round((time.perf_counter() - start) * 1000, 3), "depth": _depth})
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only the entry script's own import statements, and only the first time
+    if level == 0 and globals and globals.get("__name__") == "__main__" and name not in sys.modules:
+        with stage(f"import {name}"):
+            return _real_import(name, globals, locals, fromlist, level)
+    return _real_import(name, globals, locals, fromlist, level)
+
+
+if ENABLED:
+    # Only while the entry script imports; report_after_first_frame puts the real one back
+    builtins.__import__ = _timed_import
+
+
+def report_after_first_frame(entry):
+    """Call from App.on_start: writes the report once the first frame is on screen."""
+    if not ENABLED:
+        return
+    builtins.__import__ = _real_import  # the script's imports all ran before App.run()
+    from kivy.app import App
+    from kivy.core.window import Window
+
+    build_done = time.perf_counter()
+
+    def on_flip(*args):
+        global exit_code
+        Window.unbind(on_flip=on_flip)
+        stages.append({"stage": "first frame", "start_ms": _ms(build_done),
+                       "ms": round((time.perf_counter() - build_done) * 1000, 3), "depth": 0})
+        try:
+            exit_code = 0 if write_report(entry) else 1
+        except OSError as e:
+            print(f"Startup profile not written: {e}")
+        App.get_running_app().stop()
+
+    Window.bind(on_flip=on_flip)
+
+
+def finish():
+    """Call after App.run() returns: exit status 1 if the startup budget was exceeded."""
+    if exit_code:
+        sys.exit(exit_code)
+
+
+def write_report(entry):
+    total = _ms(time.perf_counter())
+    over = BUDGET_MS is not None and total > BUDGET_MS
+    path = REPORT if REPORT not in ("1", "true", "yes") else f"startup_profile_{entry}.json"
+    report = {"entry": entry, "total_ms": total, "budget_ms": BUDGET_MS,
+              "over_budget": over, "stages": stages}
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Startup profile: {total:.0f} ms -> {path}")
+    if over:
+        print(f"Startup budget exceeded: {total:.0f} ms > {BUDGET_MS:.0f} ms")
+    return not over
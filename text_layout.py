@@ -0,0 +1,68 @@
+import weakref
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+
+MAX_HEIGHTS = 2000  # measured heights kept before the cache starts over
+
+
+class TextLayout:
+    """Wrap widths that follow the window, and a cache of measured text heights.
+
+    wrap(label, margin) keeps label.text_size at (Window.width * scale - margin,
+    None). A resize or rotation re-lays out every wrapped label in one pass on
+    the next frame, however many resize events arrive in between.
+
+    With fit_height=pad the label's height follows its rendered text plus pad.
+    Heights are remembered by (text, font, width), so text seen before is sized
+    immediately; new text is sized when the label renders it on the next frame
+    instead of forcing a synchronous texture_update().
+
+    Labels are held weakly, so a screen the manager evicts is freed with its
+    labels rather than kept alive (and re-laid out) from here.
+    """
+
+    def __init__(self):
+        self.labels = weakref.WeakKeyDictionary()  # label -> (margin, scale, pad or None)
+        self.heights = {}
+        self._relayout = Clock.create_trigger(self.relayout)
+        Window.bind(size=self._relayout)
+
+    def wrap(self, label, margin=0, scale=1, fit_height=None):
+        first = label not in self.labels
+        self.labels[label] = (margin, scale, fit_height)
+        if first and fit_height is not None:
+            label.bind(texture_size=self._measured)
+        self._apply(label)
+
+    def forget(self, label):
+        if self.labels.pop(label, (0, 1, None))[2] is not None:
+            label.unbind(texture_size=self._measured)
+
+    def set_text(self, label, text):
+        """Change a wrapped label's text, sizing it from the cache when possible."""
+        label.text = text
+        self._apply(label)
+
+    def relayout(self, *args):
+        for label in list(self.labels):
+            self._apply(label)
+
+    def _key(self, label, width):
+        return (label.text, label.font_size, label.font_name, label.bold, label.markup, width)
+
+    def _apply(self, label):
+        margin, scale, pad = self.labels[label]
+        width = Window.width * scale - margin
+        if label.text_size[0] != width:
+            label.text_size = (width, None)
+        if pad is not None:
+            height = self.heights.get(self._key(label, width))
+            if height is not None:
+                label.height = height + pad
+
+    def _measured(self, label, size):
+        if len(self.heights) >= MAX_HEIGHTS:
+            self.heights.clear()
+        self.heights[self._key(label, label.text_size[0])] = size[1]
+        label.height = size[1] + self.labels[label][2]
@@ -0,0 +1,389 @@
+"""Mirror one device's timer screen on others around the room, over UDP multicast.
+
+The leader publishes its session state (the timer_service state message plus
+the preset's args) whenever it changes and every HEARTBEAT seconds after that.
+Each follower estimates the leader's clock offset NTP-style, with
+request/reply pairs sent straight to the leader and the lowest-delay sample
+of the last few kept. The follower then runs the same timer_service.Session
+on the leader's timeline. It chains every step onto the leader's deadlines
+itself, so a lost packet changes nothing. It hands each cue to the UI
+CUE_LEAD seconds early with its local due time, for CuePlayer.schedule to
+fire on the instant. Every state packet re-anchors the session, so a
+follower that missed a pause or joined late catches up on the next
+heartbeat.
+
+    python timer_mirror.py lead [preset [args...]]   # run a preset and publish it
+    python timer_mirror.py follow                    # print what a follower would show and play
+    python timer_mirror.py demo [followers] [loss]   # leader + followers as processes, cue skew report
+
+bjj-rehab.py leads from its AirBikeScreen with MIRROR=lead and mirrors it with
+MIRROR=follow, through the same screen code as the timer service.
+"""
+import json
+import os
+import random
+import selectors
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from timer_service import Session, encode
+
+ENV = "MIRROR"  # lead | follow
+GROUP = ("239.255.42.17", 47322)
+HEARTBEAT = 0.5  # seconds between repeats of the leader's state
+SYNC_EVERY = 2.0  # seconds between offset samples once settled
+SYNC_SAMPLES = 8  # offset samples kept; the lowest-delay one wins
+CUE_LEAD = 0.3  # how far ahead a follower hands a cue to the UI
+
+
+def _multicast_sender():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)  # this network only
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)  # followers on this machine too
+    sock.bind(("", 0))
+    return sock
+
+
+def _multicast_receiver(group):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)  # several followers on one machine
+    sock.bind(("", group[1]))
+    mreq = struct.pack("4s4s", socket.inet_aton(group[0]), socket.inet_aton("0.0.0.0"))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    return sock
+
+
+class ClockSync:
+    """Offset of the leader's monotonic clock from ours, NTP-style.
+
+    A sample is t0 (request sent, our clock), t1 (request received, leader),
+    t2 (reply sent, leader) and t3 (reply received, ours). Its round-trip
+    delay bounds its error, so the lowest-delay sample of the last few is the
+    estimate; a burst of slow samples on a busy network doesn't move it.
+    """
+
+    def __init__(self, keep=SYNC_SAMPLES):
+        self.samples = deque(maxlen=keep)  # (delay, offset)
+
+    def add(self, t0, t1, t2, t3):
+        delay = (t3 - t0) - (t2 - t1)
+        self.samples.append((delay, ((t1 - t0) + (t2 - t3)) / 2))
+
+    @property
+    def ready(self):
+        return bool(self.samples)
+
+    @property
+    def offset(self):
+        """leader time - local time."""
+        return min(self.samples)[1] if self.samples else 0.0
+
+    @property
+    def error(self):
+        return min(self.samples)[0] / 2 if self.samples else None
+
+
+class MirrorLeader:
+    """Publishes the state of the session shown on this device."""
+
+    def __init__(self, group=GROUP, clock=time.monotonic):
+        self.group = group
+        self.clock = clock
+        self.sock = _multicast_sender()
+        self.token = uuid.uuid4().hex[:8]  # a restarted leader starts a new sequence
+        self.seq = 0
+        self.state = None
+        self.closed = False
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._serve, name="mirror-leader", daemon=True)
+        self.thread.start()
+
+    def publish(self, state):
+        """state: a timer_service state message with "args", deadline on this clock."""
+        with self.lock:
+            self.state = dict(state, ev="state")
+            self._send()
+
+    def _send(self):
+        self.seq += 1
+        packet = encode({"ev": "mirror", "leader": self.token, "seq": self.seq, "state": self.state})
+        try:
+            self.sock.sendto(packet, self.group)
+        except OSError as e:
+            if not self.closed:
+                print(f"Mirror publish failed: {e}")
+
+    def _serve(self):
+        # Answers sync requests as they come; repeats the state when the heartbeat is due
+        last = self.clock()
+        while not self.closed:
+            try:
+                self.sock.settimeout(max(0.001, last + HEARTBEAT - self.clock()))
+                data, addr = self.sock.recvfrom(2048)
+                t1 = self.clock()
+            except socket.timeout:
+                data = None
+            except OSError:
+                return
+            if data:
+                try:
+                    msg = json.loads(data)
+                    if msg.get("op") == "sync":
+                        reply = {"ev": "sync", "t0": msg["t0"], "t1": t1}
+                        reply["t2"] = self.clock()
+                        self.sock.sendto(encode(reply), addr)
+                except (ValueError, KeyError, OSError):
+                    pass
+            if self.clock() - last >= HEARTBEAT:
+                last = self.clock()
+                with self.lock:
+                    if self.state:
+                        self._send()
+
+    def close(self):
+        self.closed = True
+        self.sock.close()
+
+
+class MirrorFollower:
+    """Shows what the leader runs. Looks like a timer_service.TimerClient to the
+    screens (states, sounds, send, on_event), with deadlines and cue due times
+    on the local clock; the screens' own buttons do nothing here."""
+
+    def __init__(self, on_event=None, group=GROUP, clock=time.monotonic, loss=0.0):
+        self.on_event = on_event
+        self.clock = clock
+        self.loss = loss  # drop this share of incoming packets, to test recovery
+        self.sync = ClockSync()
+        self.states = {}
+        self.sounds = False
+        self.sessions = {}  # key -> (leader token, preset, args, Session on the leader's clock)
+        self.last_due = {}  # key -> leader-time due of the last cue handed out
+        self.seq = {}  # leader token -> last seq seen
+        self.leader = None
+        self.next_sync = 0.0
+        self.sel = selectors.DefaultSelector()
+        self.group_sock = _multicast_receiver(group)
+        self.sync_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sync_sock.bind(("", 0))
+        self.sel.register(self.group_sock, selectors.EVENT_READ)
+        self.sel.register(self.sync_sock, selectors.EVENT_READ)
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="mirror-follower", daemon=True)
+        self.thread.start()
+
+    def leader_clock(self):
+        return self.clock() + self.sync.offset
+
+    def send(self, op, key=None, **fields):
+        pass  # only the leader's screen controls the session
+
+    def _emit(self, msg):
+        if msg["ev"] == "state":
+            msg = dict(msg, deadline=msg["deadline"] - self.sync.offset if msg["deadline"] is not None else None)
+            if msg["count"]:
+                self.states[msg["key"]] = msg
+            else:
+                self.states.pop(msg["key"], None)
+        else:
+            msg = dict(msg, due=msg["due"] - self.sync.offset)
+        if self.on_event:
+            self.on_event(msg)
+
+    def _run(self):
+        while not self.closed:
+            try:
+                events = self.sel.select(self._timeout())
+            except (OSError, ValueError):
+                return
+            for key, _ in events:
+                try:
+                    data, addr = key.fileobj.recvfrom(2048)
+                except OSError:
+                    continue
+                t3 = self.clock()
+                if self.loss and random.random() < self.loss:
+                    continue
+                try:
+                    self._receive(json.loads(data), addr, t3)
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"Mirror packet ignored: {e}")
+            if self.leader and self.clock() >= self.next_sync:
+                self._request_sync()
+            for key in list(self.sessions):
+                self._step(key)
+
+    def _timeout(self):
+        timeouts = [self.next_sync - self.clock()] if self.leader else [HEARTBEAT]
+        now = self.leader_clock()
+        for key, (_, _, _, session) in self.sessions.items():
+            if session.timer.running:
+                due = session.timer.deadline
+                timeouts.append((due - CUE_LEAD if due > self.last_due.get(key, float("-inf")) else due) - now)
+        return max(0.0, min(timeouts))
+
+    def _request_sync(self):
+        # Quick samples until there are a few, then one every SYNC_EVERY
+        self.next_sync = self.clock() + (SYNC_EVERY if len(self.sync.samples) >= 4 else 0.1)
+        try:
+            self.sync_sock.sendto(encode({"op": "sync", "t0": self.clock()}), self.leader)
+        except OSError as e:
+            print(f"Mirror sync failed: {e}")
+
+    def _receive(self, msg, addr, t3):
+        if msg["ev"] == "sync":
+            if addr == self.leader:  # a late reply from a previous leader says nothing about this one
+                self.sync.add(msg["t0"], msg["t1"], msg["t2"], t3)
+            return
+        if msg["ev"] != "mirror":
+            return
+        if self.leader != addr:
+            # A different leader (another device, or a restart) has its own clock: start syncing over
+            self.leader, self.next_sync = addr, 0.0
+            self.sync = ClockSync()
+            self.last_due.clear()
+        token = msg["leader"]
+        if msg["seq"] <= self.seq.get(token, 0):
+            return  # reordered or repeated
+        self.seq[token] = msg["seq"]
+        if self.sync.ready:
+            self._apply(token, msg["state"])
+
+    def _apply(self, token, st):
+        key, args = st["key"], st.get("args", [])
+        known = self.sessions.get(key)
+        if not known or known[:3] != (token, st["preset"], args):
+            known = self.sessions[key] = (token, st["preset"], args, Session(key, st["preset"], args, self.leader_clock))
+        session = known[3]
+        session.idx, session.done = st["idx"], st["done"]
+        session.timer.deadline = st["deadline"] if st["running"] else None
+        session.timer.paused_left = 0.0 if st["running"] else max(st["left"], 0.0)
+        self._emit(session.state())
+        self._step(key)
+
+    def _step(self, key):
+        session = self.sessions[key][3]
+        last_due = self.last_due.get(key, float("-inf"))
+        if not session.timer.running:
+            return
+        # The next cue goes out early, armed for its instant; advance() then only moves the step on
+        due = session.timer.deadline
+        if due - CUE_LEAD <= self.leader_clock() and due > last_due and (session.loop or session.idx < len(session.steps) - 1):
+            step_type = session.steps[(session.idx + 1) % len(session.steps)][0]
+            self._emit({"ev": "cue", "key": key, "name": session.cues.get(step_type, "beep"), "due": due})
+            self.last_due[key] = last_due = due
+        for msg in session.advance():
+            if msg["ev"] == "state":
+                self._emit(msg)
+            elif msg["due"] > last_due:  # late ones after a long gap
+                self._emit(msg)
+                self.last_due[key] = last_due = msg["due"]
+
+    def close(self):
+        self.closed = True
+        self.sel.close()
+        self.group_sock.close()
+        self.sync_sock.close()
+
+
+def leader():
+    """A MirrorLeader when MIRROR=lead, else None."""
+    if os.environ.get(ENV) != "lead":
+        return None
+    try:
+        return MirrorLeader()
+    except OSError as e:
+        print(f"Mirror unavailable: {e}")
+        return None
+
+
+def follower(on_event):
+    """A MirrorFollower when MIRROR=follow, else None."""
+    if os.environ.get(ENV) != "follow":
+        return None
+    try:
+        return MirrorFollower(on_event)
+    except OSError as e:
+        print(f"Mirror unavailable: {e}")
+        return None
+
+
+# ---------------------------------------------------------------- command line
+
+def _lead(preset="loop", *args):
+    """Runs the preset once through (a looping one for one round) and pauses it."""
+    args = [int(a) for a in args] or ([5, 2, 4] if preset == "loop" else [])
+    mirror = MirrorLeader()
+    session = Session("airbike", preset, args)
+    time.sleep(1.0)  # lets followers sync before the first step
+    published = session.start()
+    while True:
+        for msg in published:
+            if msg["ev"] == "cue":
+                print(json.dumps({"cue": msg["name"], "due": msg["due"]}), flush=True)
+        if session.done or (session.loop and session.idx == 0 and published is not None and len(published) > 1):
+            break
+        mirror.publish(dict(session.state(), args=args))
+        time.sleep(max(0.0, session.timer.deadline - time.monotonic()))
+        published = session.advance()
+    session.timer.pause()
+    mirror.publish(dict(session.state(), args=args))
+    time.sleep(HEARTBEAT)
+
+
+def _follow(skew=0.0, loss=0.0):
+    """Prints each cue with its due time in true monotonic time; skew fakes a
+    device whose monotonic clock is that far from this machine's."""
+    clock = lambda: time.monotonic() + skew
+
+    def show(msg):
+        if msg["ev"] == "cue":
+            print(json.dumps({"cue": msg["name"], "due": msg["due"] - skew, "error": mirror.sync.error}), flush=True)
+        elif "--verbose" in sys.argv:
+            print(json.dumps(msg), flush=True)
+    mirror = MirrorFollower(show, clock=clock, loss=loss)
+    mirror.thread.join()
+
+
+def _demo(followers=3, loss=0.2):
+    """Runs a leader and followers (with made-up clock skews and packet loss) as
+    separate processes and reports how far each follower's cues are from the leader's."""
+    me = [sys.executable, os.path.abspath(__file__)]
+    procs = [subprocess.Popen(me + ["_follow", str(random.uniform(-1000, 1000)), str(loss)],
+                              stdout=subprocess.PIPE, text=True) for _ in range(followers)]
+    lead = subprocess.run(me + ["lead", "loop", "2", "1", "4"], stdout=subprocess.PIPE, text=True, timeout=60)
+    for p in procs:
+        p.terminate()
+    truth = [json.loads(line) for line in lead.stdout.splitlines()]
+    print(f"leader: {len(truth)} cues")
+    worst_all = 0.0
+    for i, p in enumerate(procs):
+        cues = [json.loads(line) for line in p.communicate()[0].splitlines()]
+        skews = [min(abs(c["due"] - t["due"]) for t in truth) for c in cues if c["cue"]]
+        worst = max(skews) if skews else float("nan")
+        worst_all = max(worst_all, worst if skews else 0.0)
+        print(f"follower {i}: {len(cues)} cues, worst skew {1000 * worst:.2f} ms")
+    return 0 if worst_all < 0.005 else 1
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "follow"
+    if command == "lead":
+        _lead(*sys.argv[2:])
+    elif command == "follow":
+        _follow()
+    elif command == "_follow":
+        _follow(float(sys.argv[2]), float(sys.argv[3]))
+    elif command == "demo":
+        sys.exit(_demo(*(f(a) for f, a in zip((int, float), sys.argv[2:]))))
+    else:
+        print("usage: timer_mirror.py lead [preset [args...]] | follow | demo [followers] [loss]")
+        sys.exit(1)
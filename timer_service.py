@@ -0,0 +1,394 @@
+"""The routine engine as its own process, driven over a local socket.
+
+The service owns the DeadlineTimers: it sleeps in select() until the nearest
+deadline, advances every session whose step ended, plays the cue (when it
+has audio) and broadcasts the new state. A UI stall, or the UI process being
+torn down and restarted, doesn't touch the timing; a reconnecting UI gets
+every session's state straight away and carries on showing it.
+
+Protocol: one JSON object per line, both ways.
+
+    client -> service  {"op": "start", "key": "loop30", "preset": "loop", "args": [30, 2]}
+                       {"op": "pause" | "resume" | "skip" | "back" | "stop", "key": ...}
+    service -> client  {"ev": "hello", "sounds": true}    once, on connect
+                       {"ev": "state", "key", "preset", "idx", "count", "type", "label",
+                        "running", "deadline", "left", "done"}
+                       {"ev": "cue", "key", "name", "due"}
+
+deadline and due are time.monotonic() instants; the monotonic clock is shared
+by every process on the machine (Linux, Android), so the UI can count down
+from them directly. Presets are routine_sim's, so the service does exactly
+what the simulator models.
+
+    python timer_service.py serve [address]    # run the service
+    python timer_service.py watch [address]    # print everything it broadcasts
+
+bjj-rehab.py hands its timer screens to the service when TIMER_SERVICE is
+set. On Linux the UI starts it as a plain subprocess (connect_or_spawn). On
+Android the same file is the entry point of a python-for-android service.
+"""
+import json
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from deadline_timer import DeadlineTimer
+from routine_sim import PRESETS
+from routine_timeline import RoutineTimeline
+
+LOOPING = {"loop"}  # presets that start over instead of finishing
+ENV = "TIMER_SERVICE"  # 1 to run the timer screens' routines in the service process
+IDLE_EXIT = 600  # seconds with no clients and nothing running before the service exits
+
+
+def default_address():
+    if not hasattr(socket, "AF_UNIX"):
+        return ("127.0.0.1", 47321)
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"rehab-timer-{uid}.sock")
+
+
+def _socket_for(address):
+    return socket.socket(socket.AF_UNIX if isinstance(address, str) else socket.AF_INET, socket.SOCK_STREAM)
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode()
+
+
+class Session:
+    """One routine running on a DeadlineTimer, the same way the screens run it."""
+
+    def __init__(self, key, preset, args=(), clock=time.monotonic):
+        build, self.cues, self.start_cue = PRESETS[preset]
+        self.key = key
+        self.preset = preset
+        self.steps = RoutineTimeline(build(*args))
+        self.loop = preset in LOOPING and self.steps.total > 0
+        self.clock = clock
+        self.timer = DeadlineTimer(clock)
+        self.idx = 0
+        self.done = False
+        self.timer.set(self.steps[0][1])
+
+    def state(self):
+        step_type, _, label = self.steps[self.idx]
+        return {"ev": "state", "key": self.key, "preset": self.preset, "idx": self.idx, "count": len(self.steps),
+                "type": step_type, "label": label, "running": self.timer.running,
+                "deadline": self.timer.deadline, "left": self.timer.remaining, "done": self.done}
+
+    def _cue(self, name, due):
+        return {"ev": "cue", "key": self.key, "name": name, "due": due}
+
+    def start(self):
+        self.timer.start()
+        out = [self.state()]
+        if self.start_cue:
+            out.append(self._cue(self.start_cue, self.clock()))
+        return out
+
+    def pause(self):
+        self.timer.pause()
+        return [self.state()]
+
+    def resume(self):
+        if not self.done:
+            self.timer.start()
+        return [self.state()]
+
+    def jump(self, step):
+        """Manual skip/back: the new step restarts from now, with a beep."""
+        if not 0 <= self.idx + step < len(self.steps) or self.done:
+            return []
+        self.idx += step
+        self.timer.set(self.steps[self.idx][1])
+        return [self._cue("beep", self.clock()), self.state()]
+
+    def advance(self):
+        """Every step whose deadline has passed, chained onto the previous deadline."""
+        out = []
+        finished = False
+        last = len(self.steps) - 1
+        while self.timer.running and self.timer.expired:
+            if self.idx == last and not self.loop:
+                self.done = finished = True
+                self.timer.stop()
+                break
+            ended = self.timer.deadline
+            self.idx = (self.idx + 1) % len(self.steps)
+            step_type, duration, _ = self.steps[self.idx]
+            self.timer.advance(duration)
+            out.append(self._cue(self.cues.get(step_type, "beep"), ended))
+        if out or finished:
+            out.append(self.state())
+        return out
+
+
+class ServicePlayer:
+    """Plays cues in the service process, if Kivy's audio can load here."""
+
+    def __init__(self, data_dir):
+        from kivy.core.audio import SoundLoader
+        from tone_bank import ToneBank
+        bank = ToneBank(os.path.join(data_dir, "tones"))
+        self.sounds = {name: SoundLoader.load(bank.path(name)) for name in bank.tones}
+        self.sounds = {name: s for name, s in self.sounds.items() if s}
+        if not self.sounds:
+            raise RuntimeError("no sounds loaded")
+
+    def play(self, name):
+        sound = self.sounds.get(name)
+        if sound:
+            if sound.state == 'play':
+                sound.stop()
+            sound.play()
+
+
+class TimerService:
+    def __init__(self, address=None, player=None, idle_exit=IDLE_EXIT):
+        self.address = address or default_address()
+        self.player = player
+        self.idle_exit = idle_exit
+        self.sessions = {}
+        self.clients = {}  # socket -> read buffer
+        self.sel = selectors.DefaultSelector()
+
+    def _listen(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)  # left by a service that died; connect_or_spawn found it dead
+        listener = _socket_for(self.address)
+        if not isinstance(self.address, str):
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(self.address)
+        listener.listen(4)
+        listener.setblocking(False)
+        self.sel.register(listener, selectors.EVENT_READ, None)
+        return listener
+
+    def serve_forever(self):
+        listener = self._listen()
+        idle_since = time.monotonic()
+        try:
+            while True:
+                deadlines = [s.timer.deadline for s in self.sessions.values() if s.timer.running]
+                timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else 1.0
+                for key, _ in self.sel.select(timeout):
+                    if key.data is None:
+                        self._accept(listener)
+                    else:
+                        self._read(key.fileobj)
+                for session in list(self.sessions.values()):
+                    self._broadcast(session.advance())
+                if self.clients or deadlines:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since > self.idle_exit:
+                    return
+        finally:
+            self.sel.close()
+            listener.close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def _accept(self, listener):
+        conn, _ = listener.accept()
+        conn.settimeout(0.5)  # a stuck client is dropped rather than stalling every session
+        self.clients[conn] = b""
+        self.sel.register(conn, selectors.EVENT_READ, True)
+        self._send(conn, [{"ev": "hello", "sounds": self.player is not None}]
+                   + [s.state() for s in self.sessions.values()])
+
+    def _drop(self, conn):
+        self.clients.pop(conn, None)
+        try:
+            self.sel.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        conn.close()
+
+    def _read(self, conn):
+        try:
+            data = conn.recv(4096)
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return
+        buf = self.clients[conn] + data
+        *lines, self.clients[conn] = buf.split(b"\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    self._broadcast(self.handle(json.loads(line)))
+                except (ValueError, KeyError, TypeError) as e:
+                    self._send(conn, [{"ev": "error", "error": str(e)}])
+
+    def handle(self, cmd):
+        op, key = cmd["op"], cmd.get("key")
+        if op == "start":
+            session = self.sessions[key] = Session(key, cmd["preset"], cmd.get("args", ()))
+            return session.start()
+        if op == "state":
+            return [s.state() for s in self.sessions.values()]
+        session = self.sessions[key]
+        if op == "pause":
+            return session.pause()
+        if op == "resume":
+            return session.resume()
+        if op == "skip":
+            return session.jump(1)
+        if op == "back":
+            return session.jump(-1)
+        if op == "stop":
+            del self.sessions[key]
+            return [{"ev": "state", "key": key, "running": False, "done": True, "deadline": None, "left": 0,
+                     "idx": 0, "count": 0, "type": None, "label": "", "preset": session.preset}]
+        raise ValueError(f"unknown op {op!r}")
+
+    def _broadcast(self, msgs):
+        if not msgs:
+            return
+        if self.player:
+            for msg in msgs:
+                if msg["ev"] == "cue":
+                    self.player.play(msg["name"])
+        for conn in list(self.clients):
+            self._send(conn, msgs)
+
+    def _send(self, conn, msgs):
+        try:
+            conn.sendall(b"".join(encode(m) for m in msgs))
+        except OSError:
+            self._drop(conn)
+
+
+class TimerClient:
+    """The UI side: sends commands, keeps each session's latest state and hands
+    every message to on_event(msg) from a reader thread. A dropped connection
+    (not close()) is handed on as {"ev": "lost"}."""
+
+    def __init__(self, address=None, on_event=None):
+        self.address = address or default_address()
+        self.on_event = on_event
+        self.states = {}
+        self.sounds = False
+        self.closed = False
+        self.sock = _socket_for(self.address)
+        self.sock.connect(self.address)
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._read, name="timer-client", daemon=True)
+        self.thread.start()
+
+    def send(self, op, key=None, **fields):
+        """False when the service can't be reached; the reader reports the loss."""
+        try:
+            with self.lock:
+                self.sock.sendall(encode(dict(fields, op=op, key=key)))
+            return True
+        except OSError as e:
+            print(f"Timer service send failed: {e}")
+            return False
+
+    def _read(self):
+        buf = b""
+        error = "closed by the service"
+        try:
+            while True:
+                data = self.sock.recv(4096)
+                if not data:
+                    break
+                *lines, buf = (buf + data).split(b"\n")
+                for line in lines:
+                    msg = json.loads(line)
+                    if msg["ev"] == "hello":
+                        self.sounds = msg["sounds"]
+                    elif msg["ev"] == "state" and msg["count"]:
+                        self.states[msg["key"]] = msg
+                    elif msg["ev"] == "state":
+                        self.states.pop(msg["key"], None)  # stopped
+                    if self.on_event:
+                        self.on_event(msg)
+        except (OSError, ValueError) as e:
+            error = str(e)
+        if not self.closed:
+            print(f"Timer service connection lost: {error}")
+            if self.on_event:
+                self.on_event({"ev": "lost", "error": error})
+
+    def close(self):
+        self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)  # wakes the reader thread and tells the service now
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def start_service(address):
+    if "ANDROID_ARGUMENT" in os.environ:
+        # python-for-android runs service/main.py, which calls serve() with this argument
+        from android import AndroidService
+        AndroidService("Workout timer", "Timer running").start(json.dumps(address))
+    else:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve", json.dumps(address)],
+                         start_new_session=True, stdin=subprocess.DEVNULL)
+
+
+def connect_or_spawn(address=None, on_event=None, timeout=3.0):
+    """A TimerClient for the running service, starting the service first if needed."""
+    address = address or default_address()
+    try:
+        return TimerClient(address, on_event)
+    except OSError:
+        start_service(address)
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            return TimerClient(address, on_event)
+        except OSError:
+            if time.monotonic() > end:
+                raise
+            time.sleep(0.05)
+
+
+def install(on_event):
+    """A TimerClient when TIMER_SERVICE is set (spawning the service if needed), else None."""
+    if not os.environ.get(ENV):
+        return None
+    try:
+        return connect_or_spawn(on_event=on_event)
+    except OSError as e:
+        print(f"Timer service unavailable, timing in the UI: {e}")
+        return None
+
+
+def serve(address=None, data_dir=None):
+    try:
+        player = ServicePlayer(data_dir or os.path.dirname(os.path.abspath(__file__)))
+    except Exception as e:
+        print(f"Timer service without audio, the UI plays cues ({e})")
+        player = None
+    TimerService(address, player).serve_forever()
+
+
+def _address_arg(argv):
+    if len(argv) < 3:
+        return default_address()
+    value = json.loads(argv[2]) if argv[2][:1] in '["' else argv[2]
+    return tuple(value) if isinstance(value, list) else value
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if command == "serve":
+        serve(_address_arg(sys.argv))
+    elif command == "watch":
+        client = TimerClient(_address_arg(sys.argv), on_event=print)
+        client.thread.join()
+    else:
+        print("usage: timer_service.py serve|watch [address]")
+        sys.exit(1)
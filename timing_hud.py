@@ -0,0 +1,131 @@
+import csv
+import os
+import time
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.metrics import dp
+from kivy.uix.label import Label
+
+from deadline_timer import TICK_INTERVAL
+
+ENV = "TIMING_HUD"  # 1 to enable, or the path to export the CSV to
+FRAME_NOMINAL = 1 / 60.
+FIELDS = ("t", "kind", "name", "value_ms", "nominal_ms")
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100. * len(ordered)))]
+
+
+class TimingProbe:
+    """How on time the timer screens really are, measured on the device.
+
+    tick(name, timer) goes at the top of a Clock timer callback: it records the
+    interval since the previous call (nominally TICK_INTERVAL) and, each time
+    the timer's displayed second changes, how long that second actually lasted
+    (nominally 1 s). cue() records the delay from a phase change to its sound
+    and frame() the time between buffer flips. Every sample is kept for export.
+    """
+
+    def __init__(self, csv_path, window=600):
+        self.csv_path = csv_path
+        self.window = window
+        self.samples = deque(maxlen=200000)  # (t, kind, name, value_s, nominal_s)
+        self.recent = {}  # (kind, name) -> last `window` values
+        self.last_tick = {}
+        self.last_shown = {}  # name -> (displayed seconds, when it appeared)
+        self.last_flip = None
+        self.ticks = 0  # callbacks since the overlay last refreshed
+
+    def _record(self, kind, name, value, nominal, now):
+        self.samples.append((now, kind, name, value, nominal))
+        values = self.recent.get((kind, name))
+        if values is None:
+            values = self.recent[(kind, name)] = deque(maxlen=self.window)
+        values.append(value)
+
+    def tick(self, name, timer=None):
+        now = time.monotonic()
+        self.ticks += 1
+        prev = self.last_tick.get(name)
+        self.last_tick[name] = now
+        if prev is not None and now - prev < 10 * TICK_INTERVAL:  # a longer gap is a pause
+            self._record("tick", name, now - prev, TICK_INTERVAL, now)
+        if timer is not None:
+            shown = timer.seconds_left()
+            last = self.last_shown.get(name)
+            if last is None or last[0] != shown:
+                if last is not None and last[0] - shown == 1 and now - last[1] < 3:
+                    self._record("second", name, now - last[1], 1.0, now)
+                self.last_shown[name] = (shown, now)
+
+    def cue(self, name, delay):
+        self._record("cue", name, delay, 0.0, time.monotonic())
+
+    def frame(self, *args):
+        now = time.monotonic()
+        if self.last_flip is not None:
+            self._record("frame", "flip", now - self.last_flip, FRAME_NOMINAL, now)
+        self.last_flip = now
+
+    def summary(self, dt):
+        lines = []
+        for (kind, name), values in sorted(self.recent.items()):
+            if not values:
+                continue
+            ms = [1000 * v for v in values]
+            if kind == "cue":
+                lines.append(f"cue {name}: last {ms[-1]:.0f}  p95 {percentile(ms, 95):.0f}  max {max(ms):.0f} ms")
+            else:
+                lines.append(f"{kind} {name}: p50 {percentile(ms, 50):.1f}  p95 {percentile(ms, 95):.1f}"
+                             f"  p99 {percentile(ms, 99):.1f}  max {max(ms):.1f} ms")
+        lines.append(f"clock events {len(Clock.get_events())}  ticks/s {self.ticks / dt if dt else 0:.1f}")
+        self.ticks = 0
+        return "\n".join(lines)
+
+    def export(self, path=None):
+        path = path or self.csv_path
+        try:
+            with open(path, "w", newline="") as f:
+                out = csv.writer(f)
+                out.writerow(FIELDS)
+                for t, kind, name, value, nominal in list(self.samples):
+                    out.writerow((f"{t:.6f}", kind, name, f"{1000 * value:.3f}", f"{1000 * nominal:.3f}"))
+            print(f"[timing] {len(self.samples)} samples -> {path}")
+        except OSError as e:
+            print(f"Timing export failed: {e}")
+
+
+class TimingHud(Label):
+    """Overlay in the window's top-left corner, above every screen."""
+
+    def __init__(self, probe, **kwargs):
+        super().__init__(font_size=dp(11), halign='left', valign='top', size_hint=(None, None),
+                         color=(1, 1, 0.4, 1), **kwargs)
+        self.probe = probe
+        self.bind(texture_size=self._fit)
+        Window.bind(on_flip=probe.frame)
+        Clock.schedule_interval(self.refresh, 1.0)
+
+    def _fit(self, *args):
+        self.size = self.texture_size
+        self.pos = (dp(4), Window.height - self.height - dp(4))
+
+    def refresh(self, dt):
+        self.text = self.probe.summary(dt)
+        self._fit()
+
+
+def install(data_dir):
+    """A TimingProbe with its overlay when TIMING_HUD is set, else None."""
+    value = os.environ.get(ENV)
+    if not value:
+        return None
+    path = os.path.join(data_dir, "timing.csv") if value.lower() in ("1", "true", "yes") else value
+    probe = TimingProbe(path)
+    # Added once the root exists, so the overlay draws on top of it
+    Clock.schedule_once(lambda dt: Window.add_widget(TimingHud(probe)))
+    return probe
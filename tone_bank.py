@@ -0,0 +1,83 @@
+import hashlib
+import math
+import os
+import sys
+import wave
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SAMPLE_RATE = 44100
+CACHE_VERSION = 1
+
+# name -> synthesis parameters. Changing any value gives a new cache key.
+TONES = {
+    "beep":      {"shape": "sine", "freq": 880, "duration": 0.18, "volume": 0.8},
+    "beep_high": {"shape": "sine", "freq": 1320, "duration": 0.12, "volume": 0.8},
+    "buzzer":    {"shape": "square", "freq": 220, "duration": 0.6, "volume": 0.5},
+    "countdown": {"shape": "chirp", "freq": 600, "freq_end": 1400, "duration": 0.12, "volume": 0.7},
+}
+
+
+def synthesize(shape="sine", freq=880, duration=0.2, volume=0.8, freq_end=None, rate=SAMPLE_RATE, fade=0.005):
+    """16-bit mono PCM for one tone, with a short fade at both ends to avoid clicks."""
+    n = int(duration * rate)
+    f1 = freq if freq_end is None else freq_end
+    if np is not None:
+        t = np.arange(n) / rate
+        phase = 2 * np.pi * (freq * t + (f1 - freq) * t * t / (2 * duration))
+        s = np.sin(phase)
+        if shape == "square":
+            s = np.sign(s)
+        env = np.minimum(1.0, np.minimum(t, duration - t) / fade)
+        return (s * env * volume * 32767).astype("<i2").tobytes()
+
+    out = array("h", bytes(2 * n))
+    for i in range(n):
+        t = i / rate
+        s = math.sin(2 * math.pi * (freq * t + (f1 - freq) * t * t / (2 * duration)))
+        if shape == "square":
+            s = 1.0 if s >= 0 else -1.0
+        env = min(1.0, min(t, duration - t) / fade)
+        out[i] = int(s * env * volume * 32767)
+    if sys.byteorder == "big":
+        out.byteswap()
+    return out.tobytes()
+
+
+def cache_key(params, rate=SAMPLE_RATE):
+    raw = repr((CACHE_VERSION, rate, sorted(params.items())))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class ToneBank:
+    """Cue sounds synthesised in memory and cached as WAV files in the app's private dir.
+
+    Warm starts find the cached file and skip synthesis entirely; nothing is
+    read from the shared Downloads folder.
+    """
+
+    def __init__(self, cache_dir, tones=TONES, rate=SAMPLE_RATE):
+        self.cache_dir = cache_dir
+        self.tones = tones
+        self.rate = rate
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, name):
+        params = self.tones[name]
+        path = os.path.join(self.cache_dir, f"{name}-{cache_key(params, self.rate)}.wav")
+        if not os.path.exists(path):
+            self._write(path, synthesize(rate=self.rate, **params))
+        return path
+
+    def _write(self, path, pcm):
+        tmp = path + ".tmp"
+        with wave.open(tmp, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.rate)
+            w.writeframes(pcm)
+        os.replace(tmp, path)
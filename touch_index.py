@@ -0,0 +1,90 @@
+from kivy.metrics import dp
+
+
+class TouchIndex:
+    """Uniform grid over the widgets of one layout, for point lookups.
+
+    Each widget sits in every cell its box overlaps and is re-filed when it
+    moves, so a lookup only checks the one or two widgets in the touched cell.
+    """
+
+    def __init__(self, cell=None):
+        self.cell = cell or dp(100)
+        self.buckets = {}
+        self.cells = {}  # widget -> cell keys it is filed under
+
+    def _keys(self, w):
+        c = self.cell
+        x0, y0 = int(w.x // c), int(w.y // c)
+        x1, y1 = int((w.right - 1) // c), int((w.top - 1) // c)
+        return [(x, y) for x in range(x0, max(x0, x1) + 1) for y in range(y0, max(y0, y1) + 1)]
+
+    def track(self, widget):
+        widget.bind(pos=self.update, size=self.update)
+        self.update(widget)
+
+    def untrack(self, widget):
+        widget.unbind(pos=self.update, size=self.update)
+        self._unfile(widget)
+
+    def update(self, widget, *args):
+        self._unfile(widget)
+        keys = self.cells[widget] = self._keys(widget)
+        for key in keys:
+            self.buckets.setdefault(key, []).append(widget)
+
+    def _unfile(self, widget):
+        for key in self.cells.pop(widget, ()):
+            bucket = self.buckets[key]
+            bucket.remove(widget)
+            if not bucket:
+                del self.buckets[key]
+
+    def hit(self, x, y):
+        c = self.cell
+        for w in reversed(self.buckets.get((int(x // c), int(y // c)), ())):
+            if w.collide_point(x, y):
+                return w
+        return None
+
+
+class TouchIndexed:
+    """Layout mixin: a touch goes straight to the indexed child under it.
+
+    Children with indexed_touch = True are filed in a TouchIndex as they are
+    added. Moves and the release go back to whichever child took the press, so
+    a press that slides off still gets its release. Other children (headers,
+    spacers) no longer see touches at all.
+    """
+
+    def __init__(self, **kwargs):
+        self.touch_index = TouchIndex()
+        self.touch_key = f"touch_index.{id(self)}"
+        super().__init__(**kwargs)
+
+    def add_widget(self, widget, *args, **kwargs):
+        super().add_widget(widget, *args, **kwargs)
+        if getattr(widget, 'indexed_touch', False):
+            self.touch_index.track(widget)
+
+    def remove_widget(self, widget, *args, **kwargs):
+        if getattr(widget, 'indexed_touch', False):
+            self.touch_index.untrack(widget)
+        super().remove_widget(widget, *args, **kwargs)
+
+    def on_touch_down(self, touch):
+        if self.disabled and self.collide_point(*touch.pos):
+            return True
+        w = self.touch_index.hit(*touch.pos)
+        if w is None:
+            return False
+        touch.ud[self.touch_key] = w
+        return w.dispatch('on_touch_down', touch)
+
+    def on_touch_move(self, touch):
+        w = touch.ud.get(self.touch_key)
+        return w.dispatch('on_touch_move', touch) if w is not None else False
+
+    def on_touch_up(self, touch):
+        w = touch.ud.pop(self.touch_key, None)
+        return w.dispatch('on_touch_up', touch) if w is not None else False
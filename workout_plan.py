@@ -0,0 +1,86 @@
+import re
+from collections import namedtuple
+
+from progression import progression_for
+
+# kind is "section" or "exercise"; text is the line exactly as the day list shows it
+PlanEntry = namedtuple("PlanEntry", "kind text section exercise sets reps load duration")
+
+SETS_X_REPS = re.compile(r'(\d+)\s*(?:sets?\s*)?x\s*(\d+)(?!\d)(?!\s*yds?)', re.IGNORECASE)
+SETS = re.compile(r'(\d+)\s*(?:sets?\s*)?x\s*\d', re.IGNORECASE)  # e.g. 3x40yds: a distance, not reps
+REPS = re.compile(r'(\d+)\s*reps', re.IGNORECASE)
+
+
+def lift(text, exercise):
+    """Template line whose working load is appended from the profile's 1RM."""
+    return (text, exercise)
+
+
+def weight_text(load):
+    return f"@ {load:g} lbs" if load is not None else ""  # 27.5 stays 27.5, a plated 30.0 shows as 30
+
+
+def profile_version(profile):
+    """Everything a compiled day depends on, so edits made in place are seen too."""
+    return (profile.get("current_week"), profile.get("progression"), profile.get("plate_rounding"),
+            tuple(sorted(profile.get("maxes", {}).items())))
+
+
+def parse_volume(text):
+    m = SETS_X_REPS.search(text)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    sets = SETS.search(text)
+    sets = int(sets.group(1)) if sets else None
+    m = REPS.search(text)
+    return sets, int(m.group(1)) if m else None
+
+
+class WorkoutPlan:
+    """Day templates compiled into typed entries, cached per (day, profile version).
+
+    days maps a day name to template lines: plain strings, or lift(text, exercise)
+    for lines that carry a working load. is_section(line) says which strings are
+    headers, and classify(line) returns (exercise key, duration) for the rest.
+    """
+
+    def __init__(self, days, rest_day, is_section, classify):
+        self.days = days
+        self.rest_day = rest_day
+        self.is_section = is_section
+        self.classify = classify
+        self.cache = {}
+
+    def load(self, exercise, profile):
+        try:
+            return progression_for(profile).load(exercise, int(profile["current_week"]))
+        except (TypeError, ValueError, KeyError):
+            return None
+
+    def compile(self, day, profile):
+        key = (day, profile_version(profile))
+        entries = self.cache.get(key)
+        if entries is None:
+            entries = self.cache[key] = tuple(self._compile(self.days.get(day, self.rest_day), profile))
+        return entries
+
+    def _compile(self, template, profile):
+        section = None
+        for item in template:
+            load = None
+            if isinstance(item, tuple):
+                text, lifted = item
+                load = self.load(lifted, profile)
+                text = f"{text} {weight_text(load)}"
+            else:
+                text = item
+            if self.is_section(text):
+                section = text
+                yield PlanEntry("section", text, section, None, None, None, None, None)
+                continue
+            exercise, duration = self.classify(text)
+            sets, reps = parse_volume(text)
+            yield PlanEntry("exercise", text, section, exercise, sets, reps, load, duration)
+
+    def invalidate(self):
+        self.cache.clear()
@@ -12,6 +12,14 @@ from kivy.utils import get_color_from_hex
 from kivy.uix.screenmanager import ScreenManager, Screen
 import os
 
+from deadline_timer import DeadlineTimer, TICK_INTERVAL, format_mmss
+from routine_timeline import RoutineTimeline
+from countdown_label import CountdownLabel
+import routines
+from cue_player import CuePlayer
+from tone_bank import ToneBank
+import eco_mode
+
 # --- COLORS ---
 COLOR_MENU = get_color_from_hex('#2C3E50')    # Dark Blue
 COLOR_SPRINT = get_color_from_hex('#27AE60')  # Green
@@ -20,27 +28,19 @@ COLOR_DONE = get_color_from_hex('#F39C12')    # Orange
 COLOR_BTN_GRAY = get_color_from_hex('#7F8C8D')
 
 # --- AUDIO MANAGER ---
-class SoundManager:
+class SoundManager(CuePlayer):
     def __init__(self):
-        self.sound_path = '/storage/emulated/0/Download/'
-        self.sounds = {}
+        super(SoundManager, self).__init__()
+        # Cue tones are synthesised once and cached in the app's private dir
         try:
-            self.sounds['beep'] = SoundLoader.load(os.path.join(self.sound_path, 'beep.wav'))
-            self.sounds['buzzer'] = SoundLoader.load(os.path.join(self.sound_path, 'buzzer.wav'))
+            bank = ToneBank(os.path.join(App.get_running_app().user_data_dir, 'tones'))
+            for name in bank.tones:
+                self.load(name, bank.path(name))
         except Exception as e:
             print(f"Error loading sounds: {e}")
 
-    def play(self, name):
-        sound = self.sounds.get(name)
-        if sound:
-            try:
-                if sound.state == 'play':
-                    sound.stop()
-                sound.play()
-            except:
-                pass
-
 audio_manager = None
+eco = None  # EcoMode unless ECO_MODE=0
 
 # ==========================================
 # SCREEN 1: MAIN MENU
@@ -91,9 +91,9 @@ class MenuScreen(Screen):
 class AirBikeScreen(Screen):
     def __init__(self, **kwargs):
         super(AirBikeScreen, self).__init__(**kwargs)
-        self.routine = self._build_routine()
+        self.routine = RoutineTimeline(self._build_routine())
         self.current_step_index = 0
-        self.time_remaining = 0
+        self.timer = DeadlineTimer()
         self.timer_event = None
 
         self.layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
@@ -109,7 +109,7 @@ class AirBikeScreen(Screen):
 
         self.lbl_status = Label(text="7-4-2-1-1 INTERVALS", font_size='35sp', bold=True, size_hint=(1, 0.15))
         self.lbl_info = Label(text="Tap Start", font_size='25sp', size_hint=(1, 0.1), color=(0.9, 0.9, 0.9, 1))
-        self.lbl_timer = Label(text="18:20", font_size='100sp', bold=True, size_hint=(1, 0.4))
+        self.lbl_timer = CountdownLabel(text="18:20", font_size='100sp', bold=True, size_hint=(1, 0.4))
 
         controls = BoxLayout(orientation='horizontal', spacing=10, size_hint=(1, 0.25))
         self.btn_prev = Button(text="<<", font_size='25sp', background_color=COLOR_BTN_GRAY)
@@ -131,37 +131,7 @@ class AirBikeScreen(Screen):
         self.add_widget(self.layout)
 
     def _build_routine(self):
-        r = []
-        r.append(("READY", 5, "GET READY"))
-        
-        # Set 1: 7 Reps
-        for i in range(1, 8):
-            lbl = f"SET 1 / 5   |   REP {i} / 7"
-            r.append(("SPRINT", 10, lbl))
-            r.append(("REST", 30, lbl))
-            
-        # Set 2: 4 Reps
-        for i in range(1, 5):
-            lbl = f"SET 2 / 5   |   REP {i} / 4"
-            r.append(("SPRINT", 20, lbl))
-            r.append(("REST", 60, lbl))
-            
-        # Set 3: 2 Reps
-        for i in range(1, 3):
-            lbl = f"SET 3 / 5   |   REP {i} / 2"
-            r.append(("SPRINT", 30, lbl))
-            r.append(("REST", 90, lbl))
-            
-        # Set 4: 1 Rep
-        lbl = "SET 4 / 5   |   REP 1 / 1"
-        r.append(("SPRINT", 60, lbl))
-        r.append(("REST", 180, lbl))
-        
-        # Set 5: Final
-        lbl = "SET 5 / 5   |   FINAL"
-        r.append(("SPRINT", 20, lbl))
-        r.append(("DONE", 0, "COMPLETE"))
-        return r
+        return routines.load_routine("workout_timer")
 
     def _update_rect(self, instance, value):
         self.rect.pos = instance.pos
@@ -175,6 +145,8 @@ class AirBikeScreen(Screen):
         if self.timer_event:
             self.timer_event.cancel()
             self.timer_event = None
+            self.timer.pause()
+            audio_manager.cancel(self)
             self.btn_main.text = "RESUME"
             self.btn_main.background_color = COLOR_SPRINT
         else:
@@ -182,13 +154,20 @@ class AirBikeScreen(Screen):
                 audio_manager.play('beep')
             self.btn_main.text = "STOP"
             self.btn_main.background_color = COLOR_REST
-            if self.current_step_index == 0 and self.time_remaining == 0:
+            if self.current_step_index == 0 and self.timer.remaining == 0:
                 self.load_step()
-            self.timer_event = Clock.schedule_interval(self.update_timer, 1)
+            self.timer.start()
+            self.arm_cue()
+            self.timer_event = Clock.schedule_interval(self.update_timer, TICK_INTERVAL)
 
-    def load_step(self):
+    def load_step(self, chained=False):
         step_type, duration, info_text = self.routine[self.current_step_index]
-        self.time_remaining = duration
+        # Auto-advance chains onto the previous deadline; manual skips restart from now
+        if chained:
+            self.timer.advance(duration)
+        else:
+            self.timer.set(duration)
+            audio_manager.cancel(self)
         self.lbl_info.text = info_text
         
         if step_type == "READY":
@@ -209,23 +188,31 @@ class AirBikeScreen(Screen):
             self.finish_workout()
             return
         self.update_timer_label()
+        self.arm_cue()
+
+    def arm_cue(self):
+        # The next step's beep fires on this step's deadline, not on the tick that notices it;
+        # steps already over (caught up after a stall) arm nothing
+        if self.timer.running and not self.timer.expired and self.current_step_index < len(self.routine) - 1:
+            audio_manager.countdown('countdown', self.timer.deadline, key=self)  # 3-2-1 into the next step
+            audio_manager.schedule('beep', self.timer.deadline, key=self)
 
     def update_timer(self, dt):
-        self.time_remaining -= 1
-        if self.time_remaining < 0:
-            self.go_next(None)
-        else:
+        # Catch up on every step whose deadline passed, however late this tick fired
+        while self.timer_event and self.timer.expired and self.current_step_index < len(self.routine) - 1:
+            self.go_next(None, chained=True)
+        if self.timer_event:
             self.update_timer_label()
 
     def update_timer_label(self):
-        mins, secs = divmod(self.time_remaining, 60)
-        self.lbl_timer.text = f"{mins:02d}:{secs:02d}"
+        self.lbl_timer.text = format_mmss(self.timer.seconds_left())
 
-    def go_next(self, instance):
+    def go_next(self, instance, chained=False):
         if self.current_step_index < len(self.routine) - 1:
             self.current_step_index += 1
-            audio_manager.play('beep')
-            self.load_step()
+            if not chained:
+                audio_manager.play('beep')
+            self.load_step(chained)
 
     def go_prev(self, instance):
         if self.current_step_index > 0:
@@ -237,6 +224,8 @@ class AirBikeScreen(Screen):
         if self.timer_event:
             self.timer_event.cancel()
             self.timer_event = None
+        self.timer.stop()
+        audio_manager.cancel(self)
         self.btn_main.text = "RESET"
         self.btn_main.background_color = COLOR_SPRINT
         self.current_step_index = 0
@@ -250,7 +239,7 @@ class Loop30Screen(Screen):
         self.running = False
         self.timer_event = None
         self.phase = "WORK" # WORK or BREAK
-        self.time_remaining = 30
+        self.timer = DeadlineTimer()
         
         # Default Durations
         self.default_work = 30
@@ -291,7 +280,7 @@ class Loop30Screen(Screen):
 
         # 3. Status and Timer
         self.lbl_status = Label(text="LOOP READY", font_size='40sp', bold=True, size_hint=(1, 0.2))
-        self.lbl_timer = Label(text="00:30", font_size='100sp', bold=True, size_hint=(1, 0.35))
+        self.lbl_timer = CountdownLabel(text="00:30", font_size='100sp', bold=True, size_hint=(1, 0.35))
 
         # 4. Start Button
         self.btn_main = Button(
@@ -344,17 +333,19 @@ class Loop30Screen(Screen):
         w, r = self.get_user_settings()
         
         self.phase = "WORK"
-        self.time_remaining = w
+        self.timer.set(w)
+        self.timer.start()
         self.update_visuals()
         
         audio_manager.play('beep')
-        self.timer_event = Clock.schedule_interval(self.update_loop, 1)
+        self.timer_event = Clock.schedule_interval(self.update_loop, TICK_INTERVAL)
 
     def stop_timer(self):
         self.running = False
         if self.timer_event:
             self.timer_event.cancel()
         self.timer_event = None
+        self.timer.stop()
         
         w, r = self.get_user_settings()
         
@@ -365,17 +356,16 @@ class Loop30Screen(Screen):
         self.lbl_status.text = "LOOP STOPPED"
 
     def update_loop(self, dt):
-        self.time_remaining -= 1
-        
-        if self.time_remaining < 0:
+        # Each phase starts where the previous deadline ended, so late ticks never drift
+        while self.timer.expired:
             w, r = self.get_user_settings()
             if self.phase == "WORK":
                 self.phase = "BREAK"
-                self.time_remaining = r
+                self.timer.advance(max(r, 1))
                 audio_manager.play('buzzer') 
             else:
                 self.phase = "WORK"
-                self.time_remaining = w
+                self.timer.advance(max(w, 1))
                 audio_manager.play('beep') 
         
         self.update_visuals()
@@ -388,8 +378,7 @@ class Loop30Screen(Screen):
             self.bg_color.rgba = COLOR_REST
             self.lbl_status.text = "RESET..."
 
-        mins, secs = divmod(self.time_remaining, 60)
-        self.lbl_timer.text = f"{mins:02d}:{secs:02d}"
+        self.lbl_timer.text = format_mmss(self.timer.seconds_left())
 
 # ==========================================
 # APP BUILDER
@@ -405,5 +394,16 @@ class WorkoutApp(App):
         sm.add_widget(Loop30Screen(name='loop30'))
         return sm
 
+    def on_start(self):
+        global eco
+        # Slows the loop whenever no timer is running
+        eco = eco_mode.install()
+
+    def on_stop(self):
+        if audio_manager:
+            audio_manager.report()
+        if eco:
+            eco.report()
+
 if __name__ == '__main__':
     WorkoutApp().run()